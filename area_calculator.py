@@ -1,14 +1,27 @@
-import pygame
 import concurrent.futures
+import threading
 import time
 
+from ui import get_font, render_text
+from event_log import events
+from union_area import union_area
+
+# Long-lived worker threads shared by every AreaCalculator (threads start on first use)
+area_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="AreaWorker")
+
 class AreaCalculator:
-    def __init__(self, screen_width, screen_height, cliff_rect):
+    def __init__(self, screen_width, screen_height, cliff_rect, obstacles=None, regions=None):
         # Store original pixel dimensions
         self.screen_width_px = screen_width
         self.screen_height_px = screen_height
         self.cliff_rect = cliff_rect
         
+        # Rocks and cliffs (pixel rects, may overlap); just the cliff by default
+        self.obstacles = list(obstacles) if obstacles is not None else [cliff_rect]
+        # Named regions {name: rect} to break the areas down by; None uses the
+        # five zones around the cliff
+        self.regions = regions
+        
         # Conversion factors (derived from 1008px = 630cm, 800px = 500cm)
         self.px_to_cm_x = 630 / 1008  # approximately 0.625 cm per pixel on x-axis
         self.px_to_cm_y = 500 / 800   # approximately 0.625 cm per pixel on y-axis
@@ -23,8 +36,48 @@ class AreaCalculator:
         # Define zones based on pixel dimensions, conversion happens in calculation
         self.zones = self._define_zones()
         
+        # Areas only depend on the geometry, so they are memoized per geometry
+        self._areas = None
+        self._region_areas = None
+        self._areas_key = None
+        self._lock = threading.Lock()
+    
+    def set_geometry(self, screen_width, screen_height, cliff_rect, obstacles=None):
+        """Change the screen size, cliff or obstacles; the memoized areas are recomputed on next use."""
+        with self._lock:
+            self.screen_width_px = screen_width
+            self.screen_height_px = screen_height
+            self.cliff_rect = cliff_rect
+            self.obstacles = list(obstacles) if obstacles is not None else [cliff_rect]
+            self.screen_width = screen_width * self.px_to_cm_x
+            self.screen_height = screen_height * self.px_to_cm_y
+            self.zones = self._define_zones()
+            self._areas = None
+            self._region_areas = None
+    
+    def _geometry_key(self):
+        regions = None
+        if self.regions is not None:
+            regions = tuple((name, tuple(rect)) for name, rect in self.regions.items())
+        return (self.screen_width_px, self.screen_height_px, tuple(self.cliff_rect),
+                tuple(tuple(rect) for rect in self.obstacles), regions)
+    
+    def _check_geometry(self):
+        """Drop the memoized areas if the geometry changed since they were computed."""
+        key = self._geometry_key()
+        if key != self._areas_key:
+            # The cliff or obstacle rects may have been moved in place
+            self.zones = self._define_zones()
+            self._areas = None
+            self._region_areas = None
+            self._areas_key = key
+        
     def _define_zones(self):
         """Define the zones in the game area (in pixel coordinates)."""
+        if self.regions is not None:
+            return [{"name": name, "x": rect[0], "y": rect[1], "width": rect[2], "height": rect[3]}
+                    for name, rect in self.regions.items()]
+        
         # Zone 1: Top-left area
         # Zone 2: Top-right area
         # Zone 3: Bottom-left area (excluding cliff)
@@ -49,6 +102,10 @@ class AreaCalculator:
         ]
         return zones
     
+    def zone_rects(self):
+        """Return ``{zone name: (x, y, width, height)}`` in pixels."""
+        return {zone["name"]: (zone["x"], zone["y"], zone["width"], zone["height"]) for zone in self.zones}
+    
     def calculate_area_px(self, length_px, width_px):
         """Calculate area in pixels by multiplying length and width."""
         return length_px * width_px
@@ -69,53 +126,126 @@ class AreaCalculator:
         
         return cm_area
     
+    def calculate_all_areas(self):
+        """Calculate all zone areas, reusing the memoized ones while the geometry is unchanged."""
+        start_time = time.perf_counter()
+        with self._lock:
+            self._check_geometry()
+            areas = self._areas
+            if areas is None:
+                areas = self._areas = {zone["name"]: self.calculate_zone_area(zone) for zone in self.zones}
+        computation_time = time.perf_counter() - start_time
+        return dict(areas), computation_time
+    
     def calculate_all_areas_concurrent(self):
-        """Use concurrent.futures to calculate all zone areas in parallel."""
-        start_time = time.time()
-        areas = {}
-        
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            # Submit all zone calculations
-            future_to_zone = {
-                executor.submit(self.calculate_zone_area, zone): zone 
-                for zone in self.zones
-            }
-            
-            # Collect results as they complete
-            for future in concurrent.futures.as_completed(future_to_zone):
-                zone = future_to_zone[future]
-                try:
-                    area = future.result()
-                    areas[zone["name"]] = area
-                except Exception as e:
-                    print(f"Error calculating area for {zone['name']}: {e}")
-                    areas[zone["name"]] = 0
-        
-        computation_time = time.time() - start_time
-        return areas, computation_time
+        """Calculate all zone areas on the shared worker pool (memoized like calculate_all_areas)."""
+        start_time = time.perf_counter()
+        with self._lock:
+            self._check_geometry()
+            areas = self._areas
+            if areas is None:
+                areas = {}
+                # Submit all zone calculations
+                future_to_zone = {
+                    area_executor.submit(self.calculate_zone_area, zone): zone
+                    for zone in self.zones
+                }
+                
+                # Collect results as they complete
+                for future in concurrent.futures.as_completed(future_to_zone):
+                    zone = future_to_zone[future]
+                    try:
+                        areas[zone["name"]] = future.result()
+                    except Exception as e:
+                        events.error("area_error", zone=zone["name"], error=repr(e))
+                        areas[zone["name"]] = 0
+                # Keep the zone order stable for display
+                areas = self._areas = {zone["name"]: areas[zone["name"]] for zone in self.zones}
+        computation_time = time.perf_counter() - start_time
+        return dict(areas), computation_time
+    
+    def calculate_region_areas(self):
+        """Free-water and obstacle areas in cm², per named zone and over the whole screen.
+        
+        Overlapping obstacles are counted once (exact union areas), so the
+        result is ``{"zones": {name: {"free": cm², "obstacle": cm²}},
+        "free": cm², "obstacle": cm²}``. Memoized like the zone areas.
+        """
+        with self._lock:
+            self._check_geometry()
+            if self._region_areas is None:
+                cm2_per_px = self.px_to_cm_x * self.px_to_cm_y
+                zones = {}
+                for zone in self.zones:
+                    bounds = (zone["x"], zone["y"], zone["width"], zone["height"])
+                    obstacle_px = union_area(self.obstacles, bounds)
+                    zones[zone["name"]] = {
+                        "free": (max(zone["width"], 0) * max(zone["height"], 0) - obstacle_px) * cm2_per_px,
+                        "obstacle": obstacle_px * cm2_per_px,
+                    }
+                screen = (0, 0, self.screen_width_px, self.screen_height_px)
+                obstacle_px = union_area(self.obstacles, screen)
+                self._region_areas = {
+                    "zones": zones,
+                    "free": (self.screen_width_px * self.screen_height_px - obstacle_px) * cm2_per_px,
+                    "obstacle": obstacle_px * cm2_per_px,
+                }
+            return self._region_areas
+    
+    def calculate_results(self):
+        """Return the free water per zone, free-water and obstacle totals, the cleaning time and the computation time.
+        
+        Zone areas leave out the obstacles like the total does, and the
+        cleaning time covers the free water (``total_area``).
+        """
+        start_time = time.perf_counter()
+        region_areas = self.calculate_region_areas()
+        total_area = region_areas["free"]
+        return {
+            'areas': {name: zone["free"] for name, zone in region_areas["zones"].items()},
+            'total_area': total_area,
+            'obstacle_area': region_areas["obstacle"],
+            'cleaning_time': self.calculate_cleaning_time(total_area),
+            'computation_time': time.perf_counter() - start_time
+        }
+    
+    def submit_results(self):
+        """Compute ``calculate_results`` on the shared worker pool and return its Future.
+        
+        Lets the game loop poll ``future.done()`` instead of waiting for the result.
+        """
+        return area_executor.submit(self.calculate_results)
     
     def calculate_cleaning_time(self, total_area):
         """Calculate cleaning time based on total area and cleaning rate."""
         return total_area / self.cleaning_rate
     
-    def display_results(self, screen, font, areas, total_area, cleaning_time, computation_time):
-        """Display the results on the screen."""
-
-        small_font = font if font.get_height() <= 20 else pygame.font.Font(None, 20)
+    def result_lines(self, areas, total_area, cleaning_time, computation_time, covered_area=None):
+        """Lay out the results as ``(text, color, (x, y))`` lines."""
         y_offset = 50
+        lines = []
         
-        # Display each zone area
+        # Each zone area
         for i, (zone_name, area) in enumerate(areas.items()):
-            text = small_font.render(f"Área de {zone_name}: {area:.2f} cm²", True, (255, 255, 255))
-            screen.blit(text, (10, y_offset + i * 25))
+            lines.append((f"Área de {zone_name}: {area:.2f} cm²", (255, 255, 255), (10, y_offset + i * 25)))
         
-        # Display total area and cleaning time
+        # Total area and cleaning time
         y_offset += len(areas) * 25 + 10
-        total_text = small_font.render(f"Superficie Total: {total_area:.2f} cm²", True, (255, 255, 0))
-        screen.blit(total_text, (10, y_offset))
-        
-        time_text = small_font.render(f"Tiempo de Limpieza: {cleaning_time:.2f} segundos", True, (255, 255, 0))
-        screen.blit(time_text, (10, y_offset + 25))
-        
-        comp_text = small_font.render(f"Tiempo de Cálculo: {computation_time*1000:.2f} ms", True, (255, 255, 0))
-        screen.blit(comp_text, (10, y_offset + 50))
\ No newline at end of file
+        lines.append((f"Agua Libre Total: {total_area:.2f} cm²", (255, 255, 0), (10, y_offset)))
+        lines.append((f"Tiempo de Limpieza: {cleaning_time:.2f} segundos", (255, 255, 0), (10, y_offset + 25)))
+        lines.append((f"Tiempo de Cálculo: {computation_time*1000:.2f} ms", (255, 255, 0), (10, y_offset + 50)))
+        if covered_area is not None:
+            lines.append((f"Área Recorrida: {covered_area:.2f} cm²", (255, 255, 0), (10, y_offset + 75)))
+        return lines
+    
+    def results_font(self, font):
+        """The font results are drawn with: ``font``, unless it is taller than 20px."""
+        return font if font.get_height() <= 20 else get_font(20, None)
+    
+    def display_results(self, screen, font, areas, total_area, cleaning_time, computation_time,
+                        covered_area=None):
+        """Display the results on the screen."""
+        small_font = self.results_font(font)
+        for text, color, pos in self.result_lines(areas, total_area, cleaning_time, computation_time,
+                                                  covered_area):
+            screen.blit(render_text(small_font, text, color), pos)
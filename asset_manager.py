@@ -0,0 +1,160 @@
+import pygame
+import threading
+import time
+
+from fish import load_fish_tiles
+from shark import load_shark_image
+from settings import CLIFF_RECT
+
+
+class AssetManager:
+    """Loads each game asset once per process and hands out shared references.
+
+    Every asset is registered with a loader (decodes from disk) and an
+    optional converter (e.g. ``convert_alpha``). Loaders may run on a
+    background thread via ``preload``; converters always run on the thread
+    calling ``get``, since they need the display. Timings are recorded per
+    asset in ``timings`` as ``{name: {'load': s, 'convert': s}}``.
+
+    Shared surfaces must not be drawn on; copy them first.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._converters = {}
+        self._locks = {}
+        self._raw = {}
+        self._assets = {}
+        self.timings = {}
+        self._preload_thread = None
+
+    def register(self, name, loader, converter=None):
+        """Register how to load (and optionally display-convert) an asset."""
+        self._loaders[name] = loader
+        self._converters[name] = converter
+        self._locks[name] = threading.Lock()
+
+    def is_loaded(self, name):
+        return name in self._assets
+
+    def _load_raw(self, name):
+        # Caller holds the asset's lock
+        if name not in self._raw and name not in self._assets:
+            start = time.perf_counter()
+            self._raw[name] = self._loaders[name]()
+            self.timings.setdefault(name, {})['load'] = time.perf_counter() - start
+
+    def get(self, name):
+        """Return the asset, loading and converting it on first use."""
+        asset = self._assets.get(name)
+        if asset is not None:
+            return asset
+        with self._locks[name]:
+            if name in self._assets:
+                return self._assets[name]
+            self._load_raw(name)
+            asset = self._raw.pop(name)
+            converter = self._converters[name]
+            if converter is not None and pygame.display.get_surface() is not None:
+                start = time.perf_counter()
+                asset = converter(asset)
+                self.timings[name]['convert'] = time.perf_counter() - start
+            self._assets[name] = asset
+            return asset
+
+    def preload(self, names=None, background=True):
+        """Decode the given assets (all by default) ahead of first use.
+
+        With ``background=True`` the decoding runs on a daemon thread and the
+        thread is returned; ``get`` waits for an asset still being decoded.
+        """
+        names = list(self._loaders) if names is None else list(names)
+
+        def load_all():
+            for name in names:
+                with self._locks[name]:
+                    try:
+                        self._load_raw(name)
+                    except Exception as e:
+                        # Leave it for get() to retry and raise on the main thread
+                        print(f"Error preloading asset {name}: {e}")
+
+        if not background:
+            load_all()
+            return None
+        self._preload_thread = threading.Thread(target=load_all, name="AssetPreloader", daemon=True)
+        self._preload_thread.start()
+        return self._preload_thread
+
+    def report(self):
+        """Return one line per loaded asset with its load and convert times."""
+        lines = []
+        for name, timing in self.timings.items():
+            load_ms = timing.get('load', 0.0) * 1000
+            convert_ms = timing.get('convert', 0.0) * 1000
+            lines.append(f"{name}: load {load_ms:.2f} ms, convert {convert_ms:.2f} ms")
+        return lines
+
+
+def _load_sounds(paths):
+    try:
+        return [pygame.mixer.Sound(path) for path in paths]
+    except pygame.error as e:
+        print(f"Error loading sound effects: {e}")
+        return []
+
+
+def _load_cliff():
+    try:
+        return pygame.image.load('assets/cliff.png')
+    except pygame.error:
+        # Create a placeholder if cliff image can't be loaded
+        cliff_image = pygame.Surface((440, 150))
+        cliff_image.fill((139, 69, 19))  # Brown color
+        return cliff_image
+
+
+def _load_cliff_mask(screen_width, screen_height):
+    """Collision mask of the cliff's opaque pixels within CLIFF_RECT."""
+    image = _load_cliff()
+    cliff_rect = pygame.Rect(CLIFF_RECT)
+    if image.get_size() != cliff_rect.size:
+        # cliff.png is a whole-map layer; cut the cliff out of it at screen scale
+        image = pygame.transform.scale(image, (screen_width, screen_height)).subsurface(cliff_rect)
+    return pygame.mask.from_surface(image)
+
+
+def _load_map(screen_width, screen_height):
+    try:
+        map_image = pygame.image.load("assets/seamap.png")
+        return pygame.transform.scale(map_image, (screen_width, screen_height))
+    except pygame.error:
+        # Create a basic blue background if map can't be loaded
+        map_image = pygame.Surface((screen_width, screen_height))
+        map_image.fill((0, 120, 215))  # Ocean blue
+        return map_image
+
+
+def _load_fish_tiles():
+    # Conversion is left to the manager, which does it on the main thread
+    try:
+        return load_fish_tiles("assets/fish_tiles.png", convert=False)
+    except Exception:
+        # Fallback to assets/fish.png if the other path fails
+        return load_fish_tiles("assets/fish.png", convert=False)
+
+
+def register_game_assets(manager, screen_width, screen_height):
+    """Register every asset run_game needs on ``manager``."""
+    manager.register('scream_sounds', lambda: _load_sounds(['assets/scream1.mp3', 'assets/scream2.mp3']))
+    manager.register('fish_tiles', _load_fish_tiles, lambda atlas: atlas.convert_alpha())
+    manager.register('cliff', _load_cliff, lambda image: image.convert_alpha())
+    manager.register('cliff_mask', lambda: _load_cliff_mask(screen_width, screen_height))
+    manager.register('map', lambda: _load_map(screen_width, screen_height),
+                     lambda image: image.convert())
+    manager.register('shark', lambda: load_shark_image("assets/shark.png"),
+                     lambda image: image.convert_alpha())
+
+
+# Process-wide instance shared by every game
+assets = AssetManager()
@@ -0,0 +1,130 @@
+"""Run many seeded headless games in parallel to evaluate shark tuning.
+
+Every combination of the given shark settings is played ``--runs`` times
+with seeds ``seed, seed + 1, ...`` (the same seeds for each combination, so
+they face the same fish). Runs are spread over a ProcessPoolExecutor; each
+worker process initializes pygame and loads the assets once, then plays
+its share of games and sends back a few numbers per run.
+
+    python batch_runner.py --runs 1000 --speed 2 3 --recovery 15 30 --targeting sticky nearest
+"""
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from settings import INITIAL_FISH, FPS
+
+
+def _init_worker():
+    from headless import init_headless
+    init_headless()
+
+
+def _play(task):
+    """Play one game; returns ``(config_index, cleared, sim_time, fish_eaten, cliff_collisions)``."""
+    from headless import run_headless
+    config_index, shark_config, seed, max_ticks, initial_fish, spawn_every = task
+    summary = run_headless("auto", max_ticks, initial_fish, spawn_every, seed,
+                           shark_config=shark_config)
+    return (config_index, summary['cleared'], summary['sim_time'],
+            summary['fish_eaten'], summary['cliff_collisions'])
+
+
+def summarize(shark_config, results):
+    """Aggregate the per-run results of one shark configuration."""
+    cleared = np.array([r[1] for r in results], dtype=bool)
+    sim_time = np.array([r[2] for r in results], dtype=np.float64)
+    eaten = np.array([r[3] for r in results], dtype=np.float64)
+    collisions = np.array([r[4] for r in results], dtype=np.float64)
+    clear_times = sim_time[cleared]
+    eaten_per_sec = eaten / np.maximum(sim_time, 1e-9)
+    summary = {
+        'shark': shark_config,
+        'runs': len(results),
+        'clear_rate': float(cleared.mean()) if len(results) else 0.0,
+        'eaten_per_sec_mean': float(eaten_per_sec.mean()) if len(results) else 0.0,
+        'cliff_collisions_mean': float(collisions.mean()) if len(results) else 0.0,
+    }
+    if len(clear_times):
+        p50, p95 = np.percentile(clear_times, [50, 95])
+        summary.update(time_to_clear_mean=float(clear_times.mean()),
+                       time_to_clear_p50=float(p50), time_to_clear_p95=float(p95))
+    return summary
+
+
+def run_batch(shark_configs, runs, seed=0, max_ticks=10000, initial_fish=INITIAL_FISH,
+              spawn_every=FPS, workers=None):
+    """Play ``runs`` seeded games per shark configuration across worker processes.
+
+    Returns ``(summaries, wall_time)`` with one summary per configuration,
+    in the order given.
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = [(i, config, seed + n, max_ticks, initial_fish, spawn_every)
+             for i, config in enumerate(shark_configs) for n in range(runs)]
+    # Big chunks keep the pickling overhead small next to the games themselves
+    chunksize = max(1, len(tasks) // (workers * 8))
+
+    results = [[] for _ in shark_configs]
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        for result in executor.map(_play, tasks, chunksize=chunksize):
+            results[result[0]].append(result)
+    wall_time = time.perf_counter() - start_time
+
+    return [summarize(config, config_results)
+            for config, config_results in zip(shark_configs, results)], wall_time
+
+
+def _seconds(value):
+    return f"{value:.1f}s" if value is not None else "-"
+
+
+def print_report(summaries, wall_time):
+    total_runs = sum(s['runs'] for s in summaries)
+    print(f"{total_runs} runs in {wall_time:.2f} s ({total_runs / wall_time:.1f} runs/s)")
+    print(f"{'speed':>6}{'recovery':>10}{'targeting':>11}{'cleared':>9}"
+          f"{'clear p50':>11}{'clear p95':>11}{'eaten/s':>9}{'cliff':>8}")
+    for s in summaries:
+        shark = s['shark']
+        print(f"{shark['speed']:>6}{shark['collision_recovery_time']:>10}{shark['targeting']:>11}"
+              f"{s['clear_rate']:>9.1%}{_seconds(s.get('time_to_clear_p50')):>11}"
+              f"{_seconds(s.get('time_to_clear_p95')):>11}"
+              f"{s['eaten_per_sec_mean']:>9.3f}{s['cliff_collisions_mean']:>8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-run headless Fish Frenzy games")
+    parser.add_argument("--runs", type=int, default=100, help="games per shark configuration")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--ticks", type=int, default=10000, help="tick limit per game")
+    parser.add_argument("--fish", type=int, default=INITIAL_FISH, help="initial number of fish")
+    parser.add_argument("--spawn-every", type=int, default=FPS,
+                        help="ticks between fish spawns, 0 to disable")
+    parser.add_argument("--speed", type=float, nargs="+", default=[2], help="shark speeds to try")
+    parser.add_argument("--recovery", type=int, nargs="+", default=[30],
+                        help="collision_recovery_time values to try")
+    parser.add_argument("--targeting", nargs="+", default=['sticky'], choices=['sticky', 'nearest'],
+                        help="shark targeting strategies to try")
+    parser.add_argument("--output", default=None, help="write the summaries to this JSON file")
+    args = parser.parse_args(argv)
+
+    shark_configs = [{'speed': speed, 'collision_recovery_time': recovery, 'targeting': targeting}
+                     for speed, recovery, targeting
+                     in itertools.product(args.speed, args.recovery, args.targeting)]
+    summaries, wall_time = run_batch(shark_configs, args.runs, args.seed, args.ticks,
+                                     args.fish, args.spawn_every, args.workers)
+    print_report(summaries, wall_time)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'wall_time': wall_time, 'configs': summaries}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""Scaling benchmarks for the simulation core.
+
+Drives the real Simulation (FishSwarm, Shark, CollisionHandler), create_fish
+and AreaCalculator headlessly over a sweep of fish counts, and records for
+each count:
+
+- ticks/sec and per-phase p50/p95/p99 times (from the frame profiler)
+- peak traced memory for building and running the world (tracemalloc)
+- allocation churn per tick: the mean tracemalloc peak above the start of
+  the tick (transient bytes) and the net change in allocated blocks
+
+Smaller suites run once before the sweep:
+
+- fish_path: per-call time of ``Fish.move`` and ``CollisionHandler.handle_collision``,
+  and the bytes of one Fish handle
+- obstacles: ``ObstacleMap.hits`` over a whole swarm as rocks are added
+- cliff_masks: frame time with pixel-accurate cliff collisions against rects only
+- sharks: shark AI time per tick in multi-shark mode as the pack grows
+- schooling: fish movement time, random walk against schooling
+
+Eaten fish are respawned every tick so the population stays at the target
+count. Results are written as JSON; ``--compare`` checks them against a
+stored baseline and exits non-zero on regressions.
+
+    python benchmark.py --counts 10 100 1000 --ticks 300 --output bench_results.json
+    python benchmark.py --compare bench_baseline.json
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pygame
+
+from headless import init_headless
+from asset_manager import assets
+from fish import Fish, create_fish
+from collision_handler import CollisionHandler
+from obstacle_map import ObstacleMap
+from fish_swarm import FISH_SIZE
+from simulation import Simulation
+from area_calculator import AreaCalculator
+from profiler import profiler
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, CLIFF_RECT
+
+DEFAULT_COUNTS = [10, 100, 1000, 10000, 100000]
+
+# Ticks between area recalculations, matching run_game's 5 s at 60 ticks/s
+AREA_INTERVAL_TICKS = 300
+
+
+def build_world(fish_count, seed, pixel_collisions=True, shark_count=1, fish_behaviour='random_walk'):
+    random.seed(seed)
+    cliff_mask = assets.get('cliff_mask') if pixel_collisions else None
+    sim = Simulation(assets.get('fish_tiles'), assets.get('shark'), SCREEN_WIDTH, SCREEN_HEIGHT,
+                     pygame.Rect(CLIFF_RECT), cliff_mask=cliff_mask, shark_count=shark_count,
+                     fish_behaviour=fish_behaviour)
+    sim.fish.rng = np.random.default_rng(seed)
+    sim.profiler = profiler
+    sim.spawn_fish_batch(fish_count)
+    return sim
+
+
+def run_ticks(sim, area_calculator, ticks, fish_count):
+    """Step the world ``ticks`` times, keeping the population at ``fish_count``."""
+    for tick in range(ticks):
+        profiler.begin_frame()
+        if tick % AREA_INTERVAL_TICKS == 0:
+            areas, _ = area_calculator.calculate_all_areas_concurrent()
+            area_calculator.calculate_cleaning_time(sum(areas.values()))
+        profiler.mark('areas')
+        sim.step()
+        if len(sim.fish) < fish_count:
+            sim.spawn_fish_batch(fish_count - len(sim.fish))
+        profiler.mark('respawn')
+        profiler.end_frame()
+
+
+def bench_create_fish(samples=1000):
+    """Mean microseconds for create_fish to build a standalone Fish."""
+    fish_list = assets.get('fish_tiles')
+    cliff_rect = pygame.Rect(CLIFF_RECT)
+    start = time.perf_counter()
+    for _ in range(samples):
+        create_fish(fish_list, SCREEN_WIDTH, SCREEN_HEIGHT, cliff_rect)
+    return (time.perf_counter() - start) / samples * 1e6
+
+
+def bench_fish_path(fish_count=1000, rounds=20, seed=1):
+    """Per-call microseconds of the scalar fish path and bytes per Fish handle."""
+    sim = build_world(fish_count, seed)
+    fish = list(sim.fish)
+    handler = CollisionHandler()
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for f in fish:
+            f.move(SCREEN_WIDTH, SCREEN_HEIGHT)
+    move_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for f in fish:
+            handler.handle_collision(f)
+    bounce_time = time.perf_counter() - start
+
+    ids = sim.fish.ids[:fish_count].tolist()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    handles = [Fish.view(sim.fish, fish_id) for fish_id in ids]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    calls = rounds * fish_count
+    return {
+        'move_us': move_time / calls * 1e6,
+        'bounce_us': bounce_time / calls * 1e6,
+        # Less the list's own pointer to each handle
+        'handle_bytes': (after - before) / len(handles) - 8,
+    }
+
+
+def bench_obstacles(fish_count=10000, obstacle_counts=(1, 10, 100), rounds=20, seed=1):
+    """Milliseconds per ``ObstacleMap.hits`` over a whole swarm, per number of obstacles.
+
+    The cliff is always there; the other obstacles are small random rocks.
+    """
+    sim = build_world(fish_count, seed)
+    xs, ys = sim.fish.x[:fish_count], sim.fish.y[:fish_count]
+    rng = random.Random(seed)
+    timings = {}
+    for count in obstacle_counts:
+        rocks = [(rng.randrange(SCREEN_WIDTH), rng.randrange(SCREEN_HEIGHT), 8, 8) for _ in range(count - 1)]
+        obstacle_map = ObstacleMap(SCREEN_WIDTH, SCREEN_HEIGHT, [sim.cliff_rect] + rocks)
+        obstacle_map.hits(xs, ys, FISH_SIZE, FISH_SIZE)  # Build the table outside the timing
+        start = time.perf_counter()
+        for _ in range(rounds):
+            obstacle_map.hits(xs, ys, FISH_SIZE, FISH_SIZE)
+        timings[str(count)] = (time.perf_counter() - start) / rounds * 1e3
+    return {'fish': fish_count, 'ms_per_query': timings}
+
+
+def bench_cliff_masks(counts=(100, 10000), ticks=200, rounds=3, seed=1):
+    """Frame p50 (ms) with rect-only and pixel-accurate cliff collisions, per fish count.
+
+    The two modes alternate for ``rounds`` rounds and keep their best p50,
+    so machine noise doesn't land on one side only.
+    """
+    area_calculator = AreaCalculator(SCREEN_WIDTH, SCREEN_HEIGHT, pygame.Rect(CLIFF_RECT))
+    results = []
+    for fish_count in counts:
+        best = {}
+        for _ in range(rounds):
+            for mode, pixel_collisions in (('rect', False), ('mask', True)):
+                sim = build_world(fish_count, seed, pixel_collisions)
+                profiler.reset()
+                profiler.enable()
+                run_ticks(sim, area_calculator, ticks, fish_count)
+                frame_p50 = profiler.stats()['frame'][0]
+                profiler.enable(False)
+                best[mode] = min(best.get(mode, frame_p50), frame_p50)
+        results.append({'fish': fish_count, 'rect_ms': best['rect'], 'mask_ms': best['mask'],
+                        'overhead': best['mask'] / best['rect'] - 1})
+    return results
+
+
+def bench_sharks(shark_counts=(5, 50, 200), fish_count=1000, ticks=200, seed=1):
+    """Shark AI p50/p95 (ms) per tick in multi-shark mode, per number of sharks."""
+    area_calculator = AreaCalculator(SCREEN_WIDTH, SCREEN_HEIGHT, pygame.Rect(CLIFF_RECT))
+    results = []
+    for shark_count in shark_counts:
+        sim = build_world(fish_count, seed, shark_count=shark_count)
+        profiler.reset()
+        profiler.enable()
+        run_ticks(sim, area_calculator, ticks, fish_count)
+        p50, p95, _ = profiler.stats()['shark_ai']
+        profiler.enable(False)
+        results.append({'sharks': shark_count, 'fish': fish_count, 'shark_ai_p50_ms': p50,
+                        'shark_ai_p95_ms': p95})
+    return results
+
+
+def bench_schooling(counts=(1000, 10000), ticks=200, seed=1):
+    """Fish movement p50 (ms) per tick for random-walk and schooling fish, per fish count."""
+    area_calculator = AreaCalculator(SCREEN_WIDTH, SCREEN_HEIGHT, pygame.Rect(CLIFF_RECT))
+    results = []
+    for fish_count in counts:
+        result = {'fish': fish_count}
+        for behaviour in ('random_walk', 'schooling'):
+            sim = build_world(fish_count, seed, fish_behaviour=behaviour)
+            profiler.reset()
+            profiler.enable()
+            run_ticks(sim, area_calculator, ticks, fish_count)
+            result[behaviour + '_ms'] = profiler.stats()['fish_move'][0]
+            profiler.enable(False)
+        results.append(result)
+    return results
+
+
+def bench_count(fish_count, ticks, memory_ticks, seed):
+    area_calculator = AreaCalculator(SCREEN_WIDTH, SCREEN_HEIGHT, pygame.Rect(CLIFF_RECT))
+
+    # Timing pass (no tracemalloc, it slows everything down)
+    setup_start = time.perf_counter()
+    sim = build_world(fish_count, seed)
+    setup_time = time.perf_counter() - setup_start
+    profiler.reset()
+    profiler.enable()
+    run_start = time.perf_counter()
+    run_ticks(sim, area_calculator, ticks, fish_count)
+    run_time = time.perf_counter() - run_start
+    phases = profiler.stats()
+    profiler.enable(False)
+
+    # Memory pass
+    tracemalloc.start()
+    sim = build_world(fish_count, seed)
+    blocks_before = sys.getallocatedblocks()
+    transient = []
+    for _ in range(memory_ticks):
+        tick_start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        run_ticks(sim, area_calculator, 1, fish_count)
+        _, tick_peak = tracemalloc.get_traced_memory()
+        transient.append(tick_peak - tick_start)
+    blocks_after = sys.getallocatedblocks()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'fish': fish_count,
+        'ticks': ticks,
+        'ticks_per_sec': ticks / run_time,
+        'setup_sec': setup_time,
+        'spawn_us_per_fish': setup_time / max(fish_count, 1) * 1e6,
+        'phases_ms': {name: {'p50': p50, 'p95': p95, 'p99': p99}
+                      for name, (p50, p95, p99) in phases.items()},
+        'peak_memory_bytes': peak,
+        'alloc_bytes_per_tick': float(np.mean(transient)) if transient else 0.0,
+        'net_blocks_per_tick': (blocks_after - blocks_before) / max(memory_ticks, 1),
+    }
+
+
+def run_suite(counts, ticks, memory_ticks, seed):
+    init_headless()
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pygame': pygame.version.ver,
+            'machine': platform.machine(),
+            'ticks': ticks,
+            'seed': seed,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'create_fish_us': bench_create_fish(),
+        'fish_path': bench_fish_path(seed=seed),
+        'obstacles': bench_obstacles(seed=seed),
+        'cliff_masks': bench_cliff_masks(seed=seed),
+        'sharks': bench_sharks(seed=seed),
+        'schooling': bench_schooling(seed=seed),
+        'runs': [],
+    }
+    fish_path = results['fish_path']
+    print(f"Fish.move {fish_path['move_us']:.2f} us, handle_collision {fish_path['bounce_us']:.2f} us, "
+          f"{fish_path['handle_bytes']:.0f} bytes per Fish handle")
+    obstacles = results['obstacles']
+    print(f"Obstacle broadphase, {obstacles['fish']} fish: " +
+          ", ".join(f"{count} obstacles {ms:.3f} ms" for count, ms in obstacles['ms_per_query'].items()))
+    for run in results['cliff_masks']:
+        print(f"Cliff collisions, {run['fish']} fish: frame p50 rect-only {run['rect_ms']:.3f} ms, "
+              f"pixel masks {run['mask_ms']:.3f} ms ({run['overhead']:+.1%})")
+    for run in results['sharks']:
+        print(f"Shark pack, {run['sharks']} sharks / {run['fish']} fish: "
+              f"shark AI p50 {run['shark_ai_p50_ms']:.3f} ms, p95 {run['shark_ai_p95_ms']:.3f} ms")
+    for run in results['schooling']:
+        print(f"Fish movement, {run['fish']} fish: p50 random walk {run['random_walk_ms']:.3f} ms, "
+              f"schooling {run['schooling_ms']:.3f} ms")
+    for fish_count in counts:
+        result = bench_count(fish_count, ticks, memory_ticks, seed)
+        results['runs'].append(result)
+        print(f"{fish_count:>7} fish: {result['ticks_per_sec']:10.1f} ticks/s, "
+              f"frame p50 {result['phases_ms']['frame']['p50']:.3f} ms, "
+              f"peak {result['peak_memory_bytes'] / 1e6:.1f} MB, "
+              f"{result['alloc_bytes_per_tick'] / 1e3:.1f} kB/tick")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regression messages (empty when nothing regressed).
+
+    A run regresses when its ticks/sec drops, or a phase p50 or the peak
+    memory grows, by more than ``tolerance`` (a fraction) against the
+    baseline run with the same fish count.
+    """
+    regressions = []
+    baseline_runs = {run['fish']: run for run in baseline['runs']}
+    for run in results['runs']:
+        base = baseline_runs.get(run['fish'])
+        if base is None:
+            continue
+        label = f"{run['fish']} fish"
+        if run['ticks_per_sec'] < base['ticks_per_sec'] * (1 - tolerance):
+            regressions.append(f"{label}: ticks/sec {base['ticks_per_sec']:.1f} -> {run['ticks_per_sec']:.1f}")
+        for name, times in run['phases_ms'].items():
+            base_times = base['phases_ms'].get(name)
+            # Ignore phases too short to time reliably
+            if base_times is None or base_times['p50'] < 0.01:
+                continue
+            if times['p50'] > base_times['p50'] * (1 + tolerance):
+                regressions.append(f"{label}: {name} p50 {base_times['p50']:.3f} -> {times['p50']:.3f} ms")
+        if run['peak_memory_bytes'] > base['peak_memory_bytes'] * (1 + tolerance):
+            regressions.append(f"{label}: peak memory {base['peak_memory_bytes']} -> {run['peak_memory_bytes']} bytes")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fish Frenzy simulation benchmarks")
+    parser.add_argument("--counts", type=int, nargs="+", default=DEFAULT_COUNTS,
+                        help="fish counts to sweep")
+    parser.add_argument("--ticks", type=int, default=300, help="timed ticks per fish count")
+    parser.add_argument("--memory-ticks", type=int, default=30,
+                        help="ticks traced with tracemalloc per fish count")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="bench_results.json", help="where to write the results")
+    parser.add_argument("--compare", default=None, help="baseline results file to check against")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed relative slowdown/growth before flagging a regression")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.counts, args.ticks, args.memory_ticks, args.seed)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {args.compare}:")
+            for message in regressions:
+                print(f"  {message}")
+            return 1
+        print(f"No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,36 +1,36 @@
 import pygame
 
+from fish_swarm import STEP_X, STEP_Y, OPPOSITE
+
 class CollisionHandler:
-    def __init__(self):
-        # Initialize any needed variables
-        pass
+    def __init__(self, obstacle_map=None):
+        # Broadphase over the map's static obstacles (an ObstacleMap)
+        self.obstacle_map = obstacle_map
         
     def check_collision(self, obj1, obj2):
         """Check if two objects collide using their rect attributes."""
-        if hasattr(obj2, 'rect'):
-            return obj1.rect.colliderect(obj2.rect)
-        else:
-            # If obj2 is a pygame.Rect
-            return obj1.rect.colliderect(obj2)
+        # obj2 may also be a pygame.Rect
+        return obj1.rect.colliderect(getattr(obj2, 'rect', obj2))
+
+    def check_obstacles(self, obj):
+        """Index of the static obstacle ``obj`` hits, or -1 (pixel-accurate if ``obj`` has a mask)."""
+        return self.obstacle_map.hit(obj.rect, getattr(obj, 'mask', None))
+
+    def handle_swarm_collisions(self, swarm):
+        """Bounce every fish of a FishSwarm that hit a static obstacle.
+
+        Returns the bounced rows and the index of the obstacle each one hit.
+        """
+        return swarm.bounce_off_obstacles(self.obstacle_map)
             
     def handle_collision(self, fish):
         """Handle collision between fish and cliff (or other objects)."""
         # Reverse the fish direction when it hits something
-        if fish.direction == 'up':
-            fish.direction = 'down'
-        elif fish.direction == 'down':
-            fish.direction = 'up'
-        elif fish.direction == 'left':
-            fish.direction = 'right'
-        elif fish.direction == 'right':
-            fish.direction = 'left'
-            
+        direction = OPPOSITE[fish.direction_code]
+        fish.direction_code = direction
+
         # Add a small nudge to prevent the fish from getting stuck
-        if fish.direction == 'up':
-            fish.y -= 3
-        elif fish.direction == 'down':
-            fish.y += 3
-        elif fish.direction == 'left':
-            fish.x -= 3
-        elif fish.direction == 'right':
-            fish.x += 3
\ No newline at end of file
+        if STEP_X[direction]:
+            fish.x += STEP_X[direction] * 3
+        else:
+            fish.y += STEP_Y[direction] * 3
\ No newline at end of file
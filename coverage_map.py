@@ -0,0 +1,129 @@
+import math
+
+import numpy as np
+import pygame
+
+from grid_cells import cells_of
+
+# Real-world scale of the sea (1008px = 630cm, 800px = 500cm), as in AreaCalculator
+CM_PER_PX_X = 630 / 1008
+CM_PER_PX_Y = 500 / 800
+
+
+class CoverageMap:
+    """Grid of the sea recording which cells entities have visited.
+
+    ``update`` takes whole arrays of entity positions and marks their cells
+    with a few vectorized NumPy operations. Covered area is kept as running
+    totals (overall and per zone) that only grow when a cell is visited for
+    the first time, so ``covered_area`` and ``zone_coverage`` are O(1).
+    Visit counts are kept too, for the optional heatmap overlay.
+    """
+
+    def __init__(self, width, height, cell_size=8):
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.cols = math.ceil(width / cell_size)
+        self.rows = math.ceil(height / cell_size)
+        cells = self.cols * self.rows
+
+        # Area of every cell in cm² (cells on the right and bottom edges may be partial)
+        cell_widths = np.minimum(cell_size, width - np.arange(self.cols) * cell_size)
+        cell_heights = np.minimum(cell_size, height - np.arange(self.rows) * cell_size)
+        self.cell_area = (np.outer(cell_heights, cell_widths) * CM_PER_PX_X * CM_PER_PX_Y).ravel()
+
+        self.visits = np.zeros(cells, dtype=np.int32)
+        self.covered = np.zeros(cells, dtype=bool)
+        self.covered_area = 0.0  # cm² visited at least once
+
+        # Zones: each cell belongs to the first zone containing its centre
+        self.zone_names = []
+        self.zone_of_cell = np.full(cells, -1, dtype=np.int16)
+        self.zone_covered = np.zeros(0)
+
+        self.show_overlay = False
+        self._overlay = None
+        self._overlay_updates = -1
+        self.updates = 0
+
+    def set_zones(self, zones):
+        """Break the covered area down by zone; ``zones`` maps names to pixel rects."""
+        self.zone_names = list(zones)
+        centers_x = (np.arange(self.cols) + 0.5) * self.cell_size
+        centers_y = (np.arange(self.rows) + 0.5) * self.cell_size
+        cx, cy = np.meshgrid(centers_x, centers_y)
+        cx, cy = cx.ravel(), cy.ravel()
+        self.zone_of_cell.fill(-1)
+        # Assign in reverse so the first matching zone wins
+        for i in reversed(range(len(self.zone_names))):
+            x, y, w, h = zones[self.zone_names[i]]
+            inside = (cx >= x) & (cx < x + w) & (cy >= y) & (cy < y + h)
+            self.zone_of_cell[inside] = i
+        covered = np.flatnonzero(self.covered)
+        self.zone_covered = self._zone_sums(covered)
+
+    def _zone_sums(self, cells):
+        zones = self.zone_of_cell[cells]
+        inside = zones >= 0
+        sums = np.bincount(zones[inside], weights=self.cell_area[cells[inside]],
+                           minlength=len(self.zone_names))
+        return sums.astype(np.float64, copy=False)
+
+    def update(self, xs, ys):
+        """Record one tick of entity positions (arrays of pixel coordinates)."""
+        if len(xs) == 0:
+            return
+        # Work on the distinct cells only, so the cost follows the entity count, not the grid size
+        cells, counts = np.unique(cells_of(xs, ys, self.cell_size, self.cols, self.rows),
+                                  return_counts=True)
+        self.visits[cells] += counts.astype(np.int32, copy=False)
+        new_cells = cells[~self.covered[cells]]
+        if len(new_cells):
+            self.covered[new_cells] = True
+            self.covered_area += float(self.cell_area[new_cells].sum())
+            if self.zone_names:
+                self.zone_covered += self._zone_sums(new_cells)
+        self.updates += 1
+
+    def zone_coverage(self):
+        """Return ``{zone name: covered cm²}``."""
+        return dict(zip(self.zone_names, self.zone_covered.tolist()))
+
+    def covered_fraction(self):
+        return self.covered_area / float(self.cell_area.sum())
+
+    def reset(self):
+        self.visits.fill(0)
+        self.covered.fill(False)
+        self.covered_area = 0.0
+        self.zone_covered = np.zeros(len(self.zone_names))
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+
+    def overlay(self, refresh_every=30):
+        """Return ``(surface, (0, 0))`` for the heatmap, or ``(None, None)`` when hidden.
+
+        The surface is rebuilt at most every ``refresh_every`` updates.
+        """
+        if not self.show_overlay:
+            return None, None
+        if self._overlay is None or self.updates - self._overlay_updates >= refresh_every:
+            self._overlay = self._render_overlay()
+            self._overlay_updates = self.updates
+        return self._overlay, (0, 0)
+
+    def _render_overlay(self):
+        visits = self.visits.reshape(self.rows, self.cols)
+        # Log scale so a few heavily visited cells don't wash out the rest
+        heat = np.log1p(visits) / max(np.log1p(visits.max()), 1e-9)
+        rgba = np.zeros((self.rows, self.cols, 4), dtype=np.uint8)
+        rgba[..., 0] = (255 * heat).astype(np.uint8)
+        rgba[..., 1] = (80 * (1 - heat)).astype(np.uint8)
+        rgba[..., 2] = (255 * (1 - heat)).astype(np.uint8)
+        rgba[..., 3] = np.where(visits > 0, 60 + 120 * heat, 0).astype(np.uint8)
+        small = pygame.image.frombuffer(rgba.tobytes(), (self.cols, self.rows), 'RGBA')
+        heatmap = pygame.transform.scale(small, (self.cols * self.cell_size, self.rows * self.cell_size))
+        # Display-format surfaces blit much faster
+        return heatmap.convert_alpha() if pygame.display.get_surface() is not None else heatmap
@@ -0,0 +1,74 @@
+import numpy as np
+
+SLOT_BITS = 32
+SLOT_MASK = (1 << SLOT_BITS) - 1
+
+
+class EntityPool:
+    """Generation-tagged entity IDs mapped onto rows of dense storage.
+
+    An ID packs a slot number (low bits) with that slot's generation (high
+    bits). Freed slots go on a free list and are reused by later spawns with
+    their generation bumped, so a stale ID never resolves to the new
+    occupant. Allocation, release and lookup are all O(1), and the slot
+    tables are NumPy arrays so ``rows_of`` resolves many IDs in one go.
+    """
+
+    def __init__(self, capacity=64):
+        self._generation = np.zeros(capacity, dtype=np.int64)  # Current generation of each slot
+        self._row = np.full(capacity, -1, dtype=np.int64)  # Storage row of each slot's entity (-1 when free)
+        self._size = 0  # Slots handed out so far
+        self._free = []  # Free slots, reused last-freed first
+
+    def __len__(self):
+        return self._size - len(self._free)
+
+    def allocate(self, row):
+        """Create an entity stored at ``row`` and return its ID."""
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = self._size
+            if slot == len(self._row):
+                self._generation = np.concatenate([self._generation, np.zeros(slot, dtype=np.int64)])
+                self._row = np.concatenate([self._row, np.full(slot, -1, dtype=np.int64)])
+            self._size += 1
+        self._row[slot] = row
+        return (int(self._generation[slot]) << SLOT_BITS) | slot
+
+    def release(self, entity_id):
+        """Free an entity's slot; its ID becomes stale."""
+        slot = entity_id & SLOT_MASK
+        self._generation[slot] += 1
+        self._row[slot] = -1
+        self._free.append(slot)
+
+    def row_of(self, entity_id):
+        """Return the storage row of a live entity, or -1 if the ID is stale or unknown."""
+        slot = entity_id & SLOT_MASK
+        if slot >= self._size or self._generation[slot] != entity_id >> SLOT_BITS:
+            return -1
+        return int(self._row[slot])
+
+    def rows_of(self, entity_ids):
+        """``row_of`` for a whole int64 array of IDs at once (-1 for stale ones)."""
+        slots = entity_ids & SLOT_MASK
+        known = slots < self._size
+        slots = np.where(known, slots, 0)
+        rows = self._row[slots]
+        rows[~known | (self._generation[slots] != entity_ids >> SLOT_BITS)] = -1
+        return rows
+
+    def is_alive(self, entity_id):
+        return self.row_of(entity_id) >= 0
+
+    def move(self, entity_id, row):
+        """Record that a live entity's data now lives at ``row``."""
+        self._row[entity_id & SLOT_MASK] = row
+
+
+def format_id(entity_id):
+    """Human-readable form of an entity ID: ``slot`` or ``slot.generation``."""
+    slot = entity_id & SLOT_MASK
+    generation = entity_id >> SLOT_BITS
+    return f"{slot}" if generation == 0 else f"{slot}.{generation}"
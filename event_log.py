@@ -0,0 +1,117 @@
+import json
+import threading
+import time
+from collections import deque
+
+# Event levels, lowest to highest
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVEL_NAMES = {DEBUG: 'debug', INFO: 'info', WARNING: 'warning', ERROR: 'error'}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+LEVELS['off'] = OFF
+
+
+class EventLog:
+    """Structured, levelled event log for the game loop.
+
+    ``log`` only appends a tuple to an in-memory ring buffer; a background
+    writer thread drains it every ``flush_interval`` seconds and writes the
+    batch to a JSON-lines file in one call. Events below ``level`` return
+    before touching anything, and hot paths can skip building the event
+    fields altogether with ``if events.enabled(DEBUG):``. When the buffer
+    is full the oldest events are overwritten and counted in ``dropped``.
+    """
+
+    def __init__(self, level=INFO, capacity=4096):
+        self.level = level
+        self.buffer = deque(maxlen=capacity)
+        self.dropped = 0
+        self.path = None
+        self.flush_interval = 0.5
+        self._file = None
+        self._writer = None
+        self._stop_event = threading.Event()
+        self._write_lock = threading.Lock()
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def set_level(self, level):
+        self.level = LEVELS[level] if isinstance(level, str) else level
+
+    def log(self, level, event, **fields):
+        if level < self.level:
+            return
+        buffer = self.buffer
+        if len(buffer) == buffer.maxlen:
+            self.dropped += 1
+        buffer.append((time.time(), level, event, fields))
+
+    def debug(self, event, **fields):
+        self.log(DEBUG, event, **fields)
+
+    def info(self, event, **fields):
+        self.log(INFO, event, **fields)
+
+    def warning(self, event, **fields):
+        self.log(WARNING, event, **fields)
+
+    def error(self, event, **fields):
+        self.log(ERROR, event, **fields)
+
+    def open(self, path, flush_interval=0.5):
+        """Start writing events to a JSON-lines file from a background thread."""
+        self.close()
+        self.path = path
+        self.flush_interval = flush_interval
+        self._file = open(path, 'a', encoding='utf-8')
+        self._stop_event.clear()
+        self._writer = threading.Thread(target=self._run_writer, name="EventLogWriter", daemon=True)
+        self._writer.start()
+
+    def _run_writer(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        """Write every buffered event to the file in one batch."""
+        with self._write_lock:
+            if self._file is None:
+                return
+            buffer = self.buffer
+            lines = []
+            while buffer:
+                try:
+                    timestamp, level, event, fields = buffer.popleft()
+                except IndexError:
+                    break
+                record = {'t': round(timestamp, 6), 'level': LEVEL_NAMES.get(level, level), 'event': event}
+                record.update(fields)
+                lines.append(json.dumps(record, default=str))
+            if lines:
+                self._file.write('\n'.join(lines) + '\n')
+                self._file.flush()
+
+    def close(self):
+        """Stop the writer after a final flush and close the file."""
+        if self._writer is not None:
+            self._stop_event.set()
+            self._writer.join()
+            self._writer = None
+        if self._file is not None:
+            with self._write_lock:
+                self._file.close()
+                self._file = None
+
+    def recent(self, count=20):
+        """Return up to ``count`` of the newest events still in the buffer."""
+        return list(self.buffer)[-count:]
+
+
+# Process-wide event log used by the game
+events = EventLog()
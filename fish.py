@@ -1,91 +1,239 @@
 import pygame
 import random
-import time
+
+from fish_swarm import (FishSwarm, DIRECTIONS, DIRECTION_CODES, FISH_SIZE,
+                        STEP_X, STEP_Y, UP, DOWN, LEFT, RIGHT)
+from spawn_sampler import SpawnSampler
+
+# Swarms holding newly created fish until they are added to a game swarm,
+# one per atlas (keyed by its id; the swarm keeps the atlas alive)
+_detached = {}
+
+def _detached_swarm(atlas):
+    swarm = _detached.get(id(atlas))
+    if swarm is None:
+        swarm = _detached[id(atlas)] = FishSwarm(atlas=atlas)
+    return swarm
 
 class Fish:
-    def __init__(self, image, x, y):
-        self.image = pygame.transform.scale(image, (14, 14))  # Scaling 16x16 to 14x14
-        self.x = x
-        self.y = y
-        self.rect = self.image.get_rect(topleft=(x, y))  # Add rect attribute for collision detection
+    """A handle to one fish stored in a FishSwarm, addressed by entity ID.
+
+    A freshly created fish lives in a swarm shared by all detached fish of
+    its atlas until it is added to the game's swarm with ``FishSwarm.add``;
+    after that every attribute reads and writes the shared arrays. Once the
+    fish is removed from its swarm the handle is stale: ``fish in swarm`` is False and reading or
+    writing its attributes raises LookupError.
+
+    Directions are stored as integer codes (``UP``, ``DOWN``, ``LEFT``,
+    ``RIGHT``, see ``direction_code``); ``direction`` reads and writes them
+    as the old strings.
+    """
+
+    __slots__ = ('_swarm', '_id')
+
+    def __init__(self, variant, x, y, atlas):
+        # Only the variant index is stored; the image comes from the shared atlas
+        self._swarm = _detached_swarm(atlas)
+        self._id = self._swarm.spawn(variant, x, y, direction=random.randrange(4))
+
+    @classmethod
+    def view(cls, swarm, fish_id):
+        """Return a handle to an existing fish without copying it."""
+        fish = cls.__new__(cls)
+        fish._swarm = swarm
+        fish._id = fish_id
+        return fish
+
+    @property
+    def _row(self):
+        """The fish's current row in its swarm; raises LookupError once it was removed."""
+        row = self._swarm.pool.row_of(self._id)
+        if row < 0:
+            raise LookupError("fish %d has been removed from its swarm" % self._id)
+        return row
+
+    def __eq__(self, other):
+        return isinstance(other, Fish) and self._swarm is other._swarm and self._id == other._id
+
+    def __hash__(self):
+        return hash((id(self._swarm), self._id))
+
+    @property
+    def x(self):
+        return float(self._swarm.x[self._row])
+
+    @x.setter
+    def x(self, value):
+        self._swarm.x[self._row] = value
+
+    @property
+    def y(self):
+        return float(self._swarm.y[self._row])
+
+    @y.setter
+    def y(self, value):
+        self._swarm.y[self._row] = value
+
+    @property
+    def direction(self):
+        return DIRECTIONS[self._swarm.direction[self._row]]
+
+    @direction.setter
+    def direction(self, value):
+        self._swarm.direction[self._row] = DIRECTION_CODES[value]
+
+    @property
+    def direction_code(self):
+        return int(self._swarm.direction[self._row])
+
+    @direction_code.setter
+    def direction_code(self, value):
+        self._swarm.direction[self._row] = value
+
+    @property
+    def speed(self):
+        return float(self._swarm.speed[self._row])
+
+    @speed.setter
+    def speed(self, value):
+        self._swarm.speed[self._row] = value
+
+    @property
+    def id(self):
+        return self._id
 
-        # Initial movement direction (up, down, left, right)
-        self.direction = random.choice(['up', 'down', 'left', 'right'])
-        self.speed = 2  # Movement speed
+    @property
+    def last_direction_change_time(self):
+        return float(self._swarm.last_direction_change_time[self._row])
 
-        # Time tracking for direction change
-        self.last_direction_change_time = time.time()  # Time of last direction change
-        self.direction_change_interval = 0.5  # 0.5 second interval to change direction
+    @last_direction_change_time.setter
+    def last_direction_change_time(self, value):
+        self._swarm.last_direction_change_time[self._row] = value
+
+    @property
+    def direction_change_interval(self):
+        return float(self._swarm.direction_change_interval[self._row])
+
+    @direction_change_interval.setter
+    def direction_change_interval(self, value):
+        self._swarm.direction_change_interval[self._row] = value
+
+    @property
+    def variant(self):
+        return int(self._swarm.sprite[self._row])
+
+    @property
+    def image(self):
+        return self._swarm.atlas.variants[self._swarm.sprite[self._row]]
+
+    @property
+    def rect(self):
+        """Collision rect at the fish's current position."""
+        return pygame.Rect(int(self.x), int(self.y), FISH_SIZE, FISH_SIZE)
 
     def move(self, screen_width, screen_height):
-        """ Update fish position based on grid-like movement and periodic direction change """
+        """Move the fish one step in its direction and keep it on screen.
+
+        Periodic direction changes come from the swarm's tick schedule
+        (``FishSwarm.update``), so they run on simulated time like the
+        rest of the swarm.
+        """
+
+        # Look the row up once and work on plain floats and the direction code
+        swarm = self._swarm
+        row = self._row
+        direction = int(swarm.direction[row])
+        speed = float(swarm.speed[row])
 
         # Move fish based on current direction
-        if self.direction == 'up':
-            self.y -= self.speed
-        elif self.direction == 'down':
-            self.y += self.speed
-        elif self.direction == 'left':
-            self.x -= self.speed
-        elif self.direction == 'right':
-            self.x += self.speed
-
-        # Update rect position
-        self.rect.topleft = (self.x, self.y)
-
-        # Check if it's time to change direction
-        current_time = time.time()
-        if current_time - self.last_direction_change_time >= self.direction_change_interval:
-            self.last_direction_change_time = current_time  # Reset the time
-            # Randomly change the direction
-            self.direction = random.choice(['up', 'down', 'left', 'right'])
+        x = float(swarm.x[row]) + STEP_X[direction] * speed
+        y = float(swarm.y[row]) + STEP_Y[direction] * speed
 
         # Keep fish within screen boundaries
-        if self.x < 0:  # Left boundary
-            self.x = 0
-            self.direction = 'right'
-        elif self.x > screen_width - self.rect.width:  # Right boundary
-            self.x = screen_width - self.rect.width
-            self.direction = 'left'
-
-        if self.y < 0:  # Top boundary
-            self.y = 0
-            self.direction = 'down'
-        elif self.y > screen_height - self.rect.height:  # Bottom boundary
-            self.y = screen_height - self.rect.height
-            self.direction = 'up'
+        if x < 0:  # Left boundary
+            x = 0
+            direction = RIGHT
+        elif x > screen_width - FISH_SIZE:  # Right boundary
+            x = screen_width - FISH_SIZE
+            direction = LEFT
+
+        if y < 0:  # Top boundary
+            y = 0
+            direction = DOWN
+        elif y > screen_height - FISH_SIZE:  # Bottom boundary
+            y = screen_height - FISH_SIZE
+            direction = UP
+
+        swarm.x[row] = x
+        swarm.y[row] = y
+        swarm.direction[row] = direction
 
     def draw(self, screen):
         screen.blit(self.image, (self.x, self.y))
 
-# Function to load and split the tile sheet into individual fish
-def load_fish_tiles(sheet_path, tile_size=(16, 16), rows=4, cols=4):
+class FishAtlas:
+    """All fish variants pre-scaled side by side on one surface.
+
+    ``variants`` holds a 14x14 subsurface per variant; they share the atlas
+    pixels, so every fish of a variant draws from the same memory.
+    ``masks`` holds each variant's collision mask, built once here. Behaves
+    like a read-only list of the variant images.
+    """
+
+    def __init__(self, surface, count, size=FISH_SIZE):
+        self.surface = surface
+        self.size = size
+        self.variants = [surface.subsurface(pygame.Rect(i * size, 0, size, size))
+                         for i in range(count)]
+        self.masks = [pygame.mask.from_surface(variant) for variant in self.variants]
+
+    def __len__(self):
+        return len(self.variants)
+
+    def __getitem__(self, index):
+        return self.variants[index]
+
+    def __iter__(self):
+        return iter(self.variants)
+
+    def convert_alpha(self):
+        """Return a copy of the atlas converted to the display's pixel format."""
+        return FishAtlas(self.surface.convert_alpha(), len(self.variants), self.size)
+
+# Function to load the tile sheet and build the scaled fish atlas
+def load_fish_tiles(sheet_path, tile_size=(16, 16), rows=4, cols=4, convert=True):
     try:
         sheet = pygame.image.load(sheet_path)
     except pygame.error:
         # Fallback path if the provided path doesn't work
         sheet = pygame.image.load('assets/fish.png')
     
-    fish_list = []
-    
+    # Scale every 16x16 tile to 14x14 once, into a single strip
+    count = rows * cols
+    surface = pygame.Surface((count * FISH_SIZE, FISH_SIZE), pygame.SRCALPHA)
     for row in range(rows):
         for col in range(cols):
             rect = pygame.Rect(col * tile_size[0], row * tile_size[1], tile_size[0], tile_size[1])
-            fish_image = sheet.subsurface(rect)
-            fish_list.append(fish_image)
-            
-    return fish_list
+            fish_image = pygame.transform.scale(sheet.subsurface(rect), (FISH_SIZE, FISH_SIZE))
+            surface.blit(fish_image, ((row * cols + col) * FISH_SIZE, 0))
+    
+    atlas = FishAtlas(surface, count)
+    if convert and pygame.display.get_surface() is not None:
+        atlas = atlas.convert_alpha()
+    return atlas
+
+# Spawn samplers per (screen size, cliff), built on first use
+_samplers = {}
+
+def random_fish_position(screen_width, screen_height, cliff_rect):
+    """Uniformly random position where a fish fits without touching the cliff."""
+    key = (screen_width, screen_height, tuple(cliff_rect))
+    sampler = _samplers.get(key)
+    if sampler is None:
+        sampler = _samplers[key] = SpawnSampler(screen_width, screen_height, [cliff_rect])
+    return sampler.sample_one(random)
 
 # Function to create a fish safely
 def create_fish(fish_list, screen_width, screen_height, cliff_rect):
-    # Try to create a fish that doesn't overlap with the cliff
-    for _ in range(100):  # Limit attempts to prevent infinite loop
-        fish_image = random.choice(fish_list)
-        x = random.randint(0, screen_width - 14)  # 14 is the scaled fish width
-        y = random.randint(0, screen_height - 14)  # 14 is the scaled fish height
-        fish_rect = pygame.Rect(x, y, 14, 14)
-        if not fish_rect.colliderect(cliff_rect):
-            return Fish(fish_image, x, y)
-    
-    # If we can't find a valid position after many attempts, place it in a default location
-    return Fish(random.choice(fish_list), 50, 50)
\ No newline at end of file
+    x, y = random_fish_position(screen_width, screen_height, cliff_rect)
+    return Fish(random.randrange(len(fish_list)), x, y, fish_list)
@@ -0,0 +1,399 @@
+import numpy as np
+
+from entity_pool import EntityPool
+from settings import SIM_DT
+
+# Direction codes used by the swarm arrays (index into DIRECTIONS)
+DIRECTIONS = ('up', 'down', 'left', 'right')
+DIRECTION_CODES = {name: code for code, name in enumerate(DIRECTIONS)}
+UP, DOWN, LEFT, RIGHT = range(4)
+
+# Per-direction unit steps and the direction a fish takes after bouncing,
+# as plain tuples for per-fish code and as arrays for the batched paths
+STEP_X = (0, 0, -1, 1)
+STEP_Y = (-1, 1, 0, 0)
+OPPOSITE = (DOWN, UP, RIGHT, LEFT)
+DIR_DX = np.array(STEP_X, dtype=np.float64)
+DIR_DY = np.array(STEP_Y, dtype=np.float64)
+REVERSE = np.array(OPPOSITE, dtype=np.int8)
+
+FISH_SIZE = 14  # Scaled fish sprite is 14x14 pixels
+
+
+class FishSwarm:
+    """Structure-of-arrays store for every fish in the sea.
+
+    Each fish is one row of a set of contiguous NumPy arrays, so movement,
+    boundary clamping, cliff bounces and shark-eat tests run as batched
+    vector operations instead of one Python call per fish. Rows stay dense:
+    removing a fish moves the last row into its place. Fish are identified
+    by generation-tagged entity IDs from an EntityPool, which stay valid
+    while rows move and go stale once the fish is removed.
+
+    Direction changes run on the swarm's own tick counter (one tick per
+    ``update``, ``dt`` simulated seconds each): every fish's ID sits in the
+    bucket of the tick its next change is due, so an update only touches
+    the fish in the current bucket and draws their new directions in one
+    RNG call. IDs of fish removed in the meantime are skipped when their
+    bucket comes up.
+
+    A ``behaviour`` (e.g. Schooling) can replace the random walk: it then
+    steers every fish by its ``vx``/``vy`` velocity each update, and keeps
+    the direction codes following the velocities.
+    """
+
+    _COLUMNS = ('x', 'y', 'direction', 'speed', 'vx', 'vy', 'sprite',
+                'last_direction_change_time', 'direction_change_interval', 'ids')
+
+    def __init__(self, capacity=64, rng=None, atlas=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.count = 0
+
+        # Per-fish state
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.direction = np.zeros(capacity, dtype=np.int8)
+        self.speed = np.zeros(capacity, dtype=np.float64)
+        self.vx = np.zeros(capacity, dtype=np.float64)  # Velocity, used by the steering behaviour
+        self.vy = np.zeros(capacity, dtype=np.float64)
+        self.sprite = np.zeros(capacity, dtype=np.int32)
+        self.last_direction_change_time = np.zeros(capacity, dtype=np.float64)
+        self.direction_change_interval = np.zeros(capacity, dtype=np.float64)
+        self.ids = np.full(capacity, -1, dtype=np.int64)
+
+        # Entity ID -> row mapping (the ids column is the reverse)
+        self.pool = EntityPool()
+
+        # Shared pre-scaled fish variants (a FishAtlas); the sprite column
+        # holds each fish's variant index into it
+        self.atlas = atlas
+
+        # Optional spatial index (e.g. SpatialGrid) kept in sync with the rows
+        self.index = None
+
+        # Optional steering behaviour (e.g. Schooling) used instead of the random walk
+        self.behaviour = None
+
+        # Direction-change schedule: tick -> list of arrays of entity IDs due then
+        self.tick = 0
+        self.dt = SIM_DT
+        self._schedule = {}
+        # Single spawns: tick -> list of entity IDs, made into one array when due
+        self._spawned = {}
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        """Yield a Fish view for every live fish."""
+        from fish import Fish
+        return (Fish.view(self, fish_id) for fish_id in self.ids[:self.count].tolist())
+
+    def __contains__(self, fish):
+        return getattr(fish, '_swarm', None) is self and self.pool.is_alive(fish._id)
+
+    def __bool__(self):
+        return self.count > 0
+
+    def attach_index(self, index):
+        """Attach a spatial index that is kept up to date as fish spawn, move and leave."""
+        self.index = index
+        index.bind(self)
+
+    def _grow(self, needed):
+        capacity = len(self.x)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        for name in self._COLUMNS:
+            old = getattr(self, name)
+            new = np.empty(new_capacity, dtype=old.dtype)
+            new[:capacity] = old
+            setattr(self, name, new)
+
+    def is_alive(self, fish_id):
+        return self.pool.is_alive(fish_id)
+
+    def row_of(self, fish_id):
+        """Return the row of a live fish, or -1 if the ID is stale."""
+        return self.pool.row_of(fish_id)
+
+    def position_of(self, fish_id):
+        """Return (x, y) of a live fish, or None if the ID is stale."""
+        row = self.pool.row_of(fish_id)
+        if row < 0:
+            return None
+        return float(self.x[row]), float(self.y[row])
+
+    def spawn(self, sprite, x, y, direction=None, speed=2, interval=0.5, now=None):
+        """Add a fish and return its entity ID. Allocates no per-fish objects."""
+        self._grow(self.count + 1)
+        row = self.count
+        self.x[row] = x
+        self.y[row] = y
+        self.direction[row] = self.rng.integers(4) if direction is None else direction
+        self.speed[row] = speed
+        self.vx[row] = DIR_DX[self.direction[row]] * speed
+        self.vy[row] = DIR_DY[self.direction[row]] * speed
+        self.sprite[row] = sprite
+        self.last_direction_change_time[row] = self.tick * self.dt if now is None else now
+        self.direction_change_interval[row] = interval
+        fish_id = self.pool.allocate(row)
+        self.ids[row] = fish_id
+        self.count += 1
+        if self.index is not None:
+            self.index.insert(row)
+        self._spawned.setdefault(self.tick + self._interval_ticks(interval), []).append(fish_id)
+        return fish_id
+
+    def spawn_batch(self, sprites, xs, ys, speed=2, interval=0.5, now=None):
+        """Add one fish per entry of the ``sprites``/``xs``/``ys`` arrays; returns their IDs.
+
+        The columns are filled with one slice assignment each and the
+        directions drawn in one RNG call.
+        """
+        count = len(xs)
+        self._grow(self.count + count)
+        start, end = self.count, self.count + count
+        self.x[start:end] = xs
+        self.y[start:end] = ys
+        self.direction[start:end] = self.rng.integers(4, size=count)
+        self.speed[start:end] = speed
+        self.vx[start:end] = DIR_DX[self.direction[start:end]] * speed
+        self.vy[start:end] = DIR_DY[self.direction[start:end]] * speed
+        self.sprite[start:end] = sprites
+        self.last_direction_change_time[start:end] = self.tick * self.dt if now is None else now
+        self.direction_change_interval[start:end] = interval
+        allocate = self.pool.allocate
+        ids = [allocate(row) for row in range(start, end)]
+        self.ids[start:end] = ids
+        self.count = end
+        if self.index is not None:
+            for row in range(start, end):
+                self.index.insert(row)
+        self._schedule_rows(np.arange(start, end), self.ids[start:end].copy())
+        return ids
+
+    def add(self, fish, now=None):
+        """Move a fish view (usually a freshly created, detached one) into this swarm.
+
+        The fish's next direction change is scheduled a full interval from
+        this swarm's current tick; ``now`` stamps its
+        ``last_direction_change_time`` (by default it carries over).
+        """
+        source = fish._swarm
+        src_row = source.pool.row_of(fish._id)
+        if src_row < 0:
+            raise ValueError("cannot add a fish that has already been removed")
+        if self.atlas is None:
+            self.atlas = source.atlas
+        fish_id = self.spawn(
+            source.sprite[src_row],
+            source.x[src_row], source.y[src_row],
+            direction=source.direction[src_row],
+            speed=source.speed[src_row],
+            interval=source.direction_change_interval[src_row],
+            now=source.last_direction_change_time[src_row] if now is None else now,
+        )
+        source._swap_remove(src_row)
+        fish._swarm = self
+        fish._id = fish_id
+        return fish
+
+    def _interval_ticks(self, interval):
+        return max(1, int(round(interval / self.dt)))
+
+    def _schedule_rows(self, rows, ids):
+        """Schedule the next direction change of the fish at ``rows`` (with entity ``ids``)."""
+        ticks = np.maximum(1, np.rint(self.direction_change_interval[rows] / self.dt).astype(np.int64))
+        schedule = self._schedule
+        if ticks.min() == ticks.max():
+            # The usual case: every fish shares the same interval
+            schedule.setdefault(self.tick + int(ticks[0]), []).append(ids)
+            return
+        for interval in np.unique(ticks).tolist():
+            schedule.setdefault(self.tick + interval, []).append(ids[ticks == interval])
+
+    def _pop_due(self):
+        """Take the entity IDs due a direction change this tick off the schedule (or None)."""
+        due = self._schedule.pop(self.tick, [])
+        spawned = self._spawned.pop(self.tick, None)
+        if spawned:
+            due.append(np.array(spawned, dtype=np.int64))
+        if not due:
+            return None
+        return due[0] if len(due) == 1 else np.concatenate(due)
+
+    def _change_due_directions(self, now):
+        ids = self._pop_due()
+        if ids is None:
+            return
+        rows = self.pool.rows_of(ids)
+        alive = rows >= 0
+        rows, ids = rows[alive], ids[alive]
+        if len(rows) == 0:
+            return
+        self.direction[rows] = self.rng.integers(0, 4, size=len(rows))
+        self.last_direction_change_time[rows] = now
+        self._schedule_rows(rows, ids)
+
+    def update(self, screen_width, screen_height, now=None, threats=None):
+        """Move every fish one step, change due directions and clamp to the screen.
+
+        ``now`` (simulated seconds) only stamps ``last_direction_change_time``;
+        the schedule itself runs on the tick counter. With a ``behaviour``
+        set, it moves the fish instead; ``threats`` (shark centre arrays)
+        are passed on to it.
+        """
+        self.tick += 1
+        n = self.count
+        if n == 0:
+            # Nothing left to turn, but the due IDs still leave the schedule
+            self._pop_due()
+            return
+        if self.behaviour is not None:
+            # Steered fish don't take random turns
+            self._pop_due()
+            self.behaviour.steer(self, screen_width, screen_height, threats)
+            if self.index is not None:
+                self.index.sync()
+            return
+        x = self.x[:n]
+        y = self.y[:n]
+        direction = self.direction[:n]
+        speed = self.speed[:n]
+
+        # Move based on current direction
+        x += DIR_DX[direction] * speed
+        y += DIR_DY[direction] * speed
+
+        # Periodic random direction change, only for the fish due this tick
+        self._change_due_directions(self.tick * self.dt if now is None else now)
+
+        # Keep fish within screen boundaries, turning them back inwards
+        max_x = screen_width - FISH_SIZE
+        max_y = screen_height - FISH_SIZE
+        hit = x < 0
+        x[hit] = 0
+        direction[hit] = RIGHT
+        hit = x > max_x
+        x[hit] = max_x
+        direction[hit] = LEFT
+        hit = y < 0
+        y[hit] = 0
+        direction[hit] = DOWN
+        hit = y > max_y
+        y[hit] = max_y
+        direction[hit] = UP
+
+        if self.index is not None:
+            self.index.sync()
+
+    def overlapping(self, rect):
+        """Return the row indices of fish whose rect overlaps ``rect``."""
+        if self.index is not None:
+            return self.index.query_rect(rect)
+        n = self.count
+        left = self.x[:n].astype(np.int64)
+        top = self.y[:n].astype(np.int64)
+        mask = ((left < rect.right) & (left + FISH_SIZE > rect.left) &
+                (top < rect.bottom) & (top + FISH_SIZE > rect.top))
+        return np.flatnonzero(mask)
+
+    def bounce_off(self, rect):
+        """Reverse and nudge every fish overlapping ``rect``. Returns the bounced rows."""
+        rows = self.overlapping(rect)
+        self._bounce(rows)
+        return rows
+
+    def bounce_off_obstacles(self, obstacle_map):
+        """Bounce every fish touching an obstacle of an ObstacleMap.
+
+        Returns the bounced rows and the index of the obstacle each one hit.
+        """
+        n = self.count
+        masks = self.atlas.masks if self.atlas is not None else None
+        hits = obstacle_map.hits(self.x[:n], self.y[:n], FISH_SIZE, FISH_SIZE,
+                                 variants=self.sprite[:n], masks=masks)
+        rows = np.flatnonzero(hits >= 0)
+        self._bounce(rows)
+        return rows, hits[rows]
+
+    def _bounce(self, rows):
+        if len(rows):
+            new_direction = REVERSE[self.direction[rows]]
+            self.direction[rows] = new_direction
+            self.vx[rows] *= -1
+            self.vy[rows] *= -1
+            # Small nudge to prevent the fish from getting stuck
+            self.x[rows] += DIR_DX[new_direction] * 3
+            self.y[rows] += DIR_DY[new_direction] * 3
+            if self.index is not None:
+                self.index.sync(rows)
+
+    def nearest_id(self, x, y):
+        """Return the ID of the fish nearest to (x, y), or None if the swarm is empty."""
+        if self.count == 0:
+            return None
+        if self.index is not None:
+            row = self.index.nearest(x, y)
+        else:
+            dx = self.x[:self.count] - x
+            dy = self.y[:self.count] - y
+            row = int(np.argmin(dx * dx + dy * dy))
+        return int(self.ids[row])
+
+    def nearest(self, x, y):
+        """Return a Fish view of the fish nearest to (x, y), or None if the swarm is empty."""
+        fish_id = self.nearest_id(x, y)
+        if fish_id is None:
+            return None
+        from fish import Fish
+        return Fish.view(self, fish_id)
+
+    def remove(self, rows):
+        """Remove the fish at the given rows. Returns their (now stale) entity IDs."""
+        removed = []
+        # Highest rows first, so the row swapped in is never one still pending
+        for row in sorted(set(int(r) for r in rows), reverse=True):
+            removed.append(self._swap_remove(row))
+        return removed
+
+    def remove_id(self, fish_id):
+        """Remove one fish by ID in O(1). Returns False if the ID was already stale."""
+        row = self.pool.row_of(fish_id)
+        if row < 0:
+            return False
+        self._swap_remove(row)
+        return True
+
+    def _swap_remove(self, row):
+        last = self.count - 1
+        fish_id = int(self.ids[row])
+        self.pool.release(fish_id)
+        if self.index is not None:
+            self.index.remove(row)
+        if row != last:
+            # Fill the hole with the last row
+            for name in self._COLUMNS:
+                arr = getattr(self, name)
+                arr[row] = arr[last]
+            self.pool.move(int(self.ids[row]), row)
+            if self.index is not None:
+                self.index.relocate(last, row)
+        self.count = last
+        if last == 0:
+            # Every ID still scheduled is stale now
+            self._schedule.clear()
+            self._spawned.clear()
+        return fish_id
+
+    def blit_sequence(self):
+        """Return ``(surface, (x, y))`` pairs for every fish, ready for ``Surface.blits``."""
+        n = self.count
+        variants = self.atlas.variants
+        return [(variants[s], (x, y)) for s, x, y in
+                zip(self.sprite[:n].tolist(), self.x[:n].tolist(), self.y[:n].tolist())]
+
+    def draw(self, screen):
+        screen.blits(self.blit_sequence(), doreturn=False)
@@ -0,0 +1,39 @@
+import numpy as np
+
+
+def grid_shape(width, height, cell_size):
+    """Columns and rows of ``cell_size`` cells covering a ``width`` x ``height`` area."""
+    return max(1, -(-width // cell_size)), max(1, -(-height // cell_size))
+
+
+def cells_of(xs, ys, cell_size, cols, rows):
+    """Flat cell index (``row * cols + col``) of each position, clamped to the grid."""
+    # Multiplying by the reciprocal is much cheaper than float floor division
+    inv = 1.0 / cell_size
+    cx = (np.asarray(xs) * inv).astype(np.int64)
+    cy = (np.asarray(ys) * inv).astype(np.int64)
+    np.clip(cx, 0, cols - 1, out=cx)
+    np.clip(cy, 0, rows - 1, out=cy)
+    cy *= cols
+    cy += cx
+    return cy
+
+
+def sort_by_cell(cells, cell_count):
+    """Order that sorts ``cells``, and where each cell's run starts in it (plus one end offset)."""
+    # NumPy radix-sorts 16-bit keys, far faster than sorting int64 cells
+    keys = cells.astype(np.int16) if cell_count <= np.iinfo(np.int16).max else cells
+    order = np.argsort(keys, kind='stable')
+    start = np.searchsorted(cells[order], np.arange(cell_count + 1))
+    return order, start
+
+
+def expand_runs(first, counts):
+    """Every index of the runs ``first[i]:first[i] + counts[i]``, concatenated in order.
+
+    ``np.repeat(owners, counts)`` lines up each index with its run's owner.
+    """
+    ends = np.cumsum(counts)
+    if len(ends) == 0 or ends[-1] == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.arange(ends[-1]) - np.repeat(ends - counts - first, counts)
@@ -0,0 +1,180 @@
+import os
+import time
+import random
+
+import pygame
+import numpy as np
+
+from simulation import Simulation
+from spawn_scheduler import SpawnScheduler
+from asset_manager import assets, register_game_assets
+from profiler import profiler
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, CLIFF_RECT, INITIAL_FISH, FPS, FISH_BEHAVIOUR
+
+
+class ScriptedKeys:
+    """Stand-in for pygame.key.get_pressed() with a fixed set of pressed keys."""
+
+    def __init__(self, pressed=()):
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+# Script directions accepted by parse_script
+SCRIPT_KEYS = {
+    'left': pygame.K_LEFT,
+    'right': pygame.K_RIGHT,
+    'up': pygame.K_UP,
+    'down': pygame.K_DOWN,
+    'idle': None,
+}
+
+
+def parse_script(text):
+    """Parse a key script like "right:120,down+left:60,idle:30".
+
+    Each step names the keys to hold (joined by '+') and for how many ticks.
+    The script loops once it reaches the end.
+    """
+    steps = []
+    for part in text.split(','):
+        names, _, ticks = part.strip().partition(':')
+        keys = [SCRIPT_KEYS[name] for name in names.split('+')]
+        steps.append((ScriptedKeys(k for k in keys if k is not None), int(ticks)))
+    return steps
+
+
+def scripted_input(steps):
+    """Yield one ScriptedKeys per tick, looping over the script steps."""
+    while True:
+        for keys, ticks in steps:
+            for _ in range(ticks):
+                yield keys
+
+
+def chase_input(sim):
+    """Yield keys that steer a player shark towards the nearest fish each tick."""
+    while True:
+        shark = sim.shark
+        target = sim.fish.nearest(shark.x, shark.y)
+        pressed = []
+        if target is not None:
+            dx = target.x - shark.x
+            dy = target.y - shark.y
+            if dx < -shark.player_speed:
+                pressed.append(pygame.K_LEFT)
+            elif dx > shark.player_speed:
+                pressed.append(pygame.K_RIGHT)
+            if dy < -shark.player_speed:
+                pressed.append(pygame.K_UP)
+            elif dy > shark.player_speed:
+                pressed.append(pygame.K_DOWN)
+        yield ScriptedKeys(pressed)
+
+
+# Shark attributes that run_headless's shark_config may override
+SHARK_TUNING = ('speed', 'collision_recovery_time', 'targeting')
+
+
+def init_headless():
+    """Initialize pygame on SDL's dummy video and audio drivers."""
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    register_game_assets(assets, SCREEN_WIDTH, SCREEN_HEIGHT)
+
+
+def run_headless(game_mode="auto", max_ticks=10000, initial_fish=INITIAL_FISH,
+                 spawn_every=FPS, seed=None, script=None, shark_config=None, shark_count=1,
+                 fish_behaviour=None):
+    """Run the game simulation without menus or drawing, as fast as possible.
+
+    Stops after ``max_ticks`` or once every fish has been eaten. Fish arrive
+    through the game's SpawnScheduler at one per ``spawn_every`` ticks (0
+    disables spawning), planned inline rather than on its planner thread so
+    runs stay reproducible. ``shark_config``
+    overrides shark attributes named in SHARK_TUNING. ``shark_count`` above
+    one plays multi-shark mode. ``fish_behaviour`` overrides the game
+    mode's FISH_BEHAVIOUR.
+    Runs with the same ``seed`` and arguments play out identically.
+    Returns a summary dict.
+    """
+    # A seed covers every RNG of the run: `random` drives the sharks, fish
+    # variants and (through the spawn sampler's derived generator) spawn
+    # positions; the swarm's NumPy generator drives fish turns and schooling.
+    if seed is not None:
+        random.seed(seed)
+
+    fish_list = assets.get('fish_tiles')
+    shark_image = assets.get('shark')
+    player_controlled = (game_mode == "player")
+    sim = Simulation(fish_list, shark_image, SCREEN_WIDTH, SCREEN_HEIGHT,
+                     pygame.Rect(CLIFF_RECT), player_controlled, cliff_mask=assets.get('cliff_mask'),
+                     shark_count=shark_count, fish_behaviour=fish_behaviour or FISH_BEHAVIOUR[game_mode])
+    if seed is not None:
+        sim.fish.rng = np.random.default_rng(seed)
+    for name, value in (shark_config or {}).items():
+        if name not in SHARK_TUNING:
+            raise ValueError(f"Unknown shark setting: {name}")
+        for shark in sim.sharks:
+            setattr(shark, name, value)
+
+    for _ in range(initial_fish):
+        sim.spawn_fish()
+
+    if not player_controlled:
+        keys = None
+    elif script:
+        keys = scripted_input(parse_script(script))
+    else:
+        keys = chase_input(sim)
+
+    spawner = None
+    if spawn_every:
+        spawner = SpawnScheduler(sim.plan_fish_batch, rate=1 / (spawn_every * sim.dt), threaded=False)
+
+    start_time = time.perf_counter()
+
+    while sim.ticks < max_ticks and len(sim.fish) > 0:
+        profiler.begin_frame()
+        if spawner is not None:
+            for spawn in spawner.take(sim.time, len(sim.fish)):
+                sim.spawn_fish(spawn)
+        profiler.mark('spawn')
+        sim.step(next(keys) if keys is not None else None)
+        profiler.end_frame()
+
+    wall_time = time.perf_counter() - start_time
+    return {
+        'mode': game_mode,
+        'sharks': len(sim.sharks),
+        'fish_behaviour': sim.fish_behaviour,
+        'ticks': sim.ticks,
+        'sim_time': sim.time,
+        'wall_time': wall_time,
+        'ticks_per_sec': sim.ticks / wall_time if wall_time > 0 else float('inf'),
+        'fish_eaten': sim.score,
+        'fish_remaining': len(sim.fish),
+        'cliff_collisions': sim.cliff_collisions,
+        'covered_area': sim.coverage.covered_area,
+        'cleared': len(sim.fish) == 0,
+        'phases': profiler.stats() if profiler.enabled else {},
+    }
+
+
+def print_summary(summary):
+    print(f"Mode: {summary['mode']} ({summary['sharks']} shark{'s' if summary['sharks'] != 1 else ''}, "
+          f"{summary['fish_behaviour'].replace('_', ' ')} fish)")
+    print(f"Ticks: {summary['ticks']} ({'all fish eaten' if summary['cleared'] else 'tick limit reached'})")
+    print(f"Wall time: {summary['wall_time']:.3f} s")
+    print(f"Ticks/sec: {summary['ticks_per_sec']:.1f}")
+    print(f"Fish eaten: {summary['fish_eaten']} (remaining: {summary['fish_remaining']})")
+    print(f"Shark cliff collisions: {summary['cliff_collisions']}")
+    print(f"Sea covered: {summary['covered_area']:.2f} cm²")
+    if summary['phases']:
+        print(f"{'Phase':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for name, (p50, p95, p99) in summary['phases'].items():
+            print(f"{name:<12}{p50:10.4f}{p95:10.4f}{p99:10.4f}")
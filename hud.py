@@ -0,0 +1,93 @@
+import pygame
+
+from ui import render_text
+
+
+class TextWidget:
+    """One line of HUD text at a fixed screen position."""
+
+    def __init__(self, pos, font, color=(255, 255, 255)):
+        self.pos = pos
+        self.font = font
+        self.color = color
+        self.text = None
+        self.surface = None
+        self.rect = pygame.Rect(pos, (0, 0))
+
+    def set(self, text, color=None):
+        """Change the text (and optionally colour); returns whether anything changed."""
+        color = self.color if color is None else color
+        if text == self.text and color == self.color:
+            return False
+        self.text = text
+        self.color = color
+        self.surface = render_text(self.font, text, color) if text else None
+        self.rect = pygame.Rect(self.pos, self.surface.get_size() if self.surface else (0, 0))
+        return True
+
+
+class Hud:
+    """HUD text widgets composed onto one cached surface.
+
+    Setting a widget to the value it already shows does nothing. When some
+    values do change, only those widgets are re-rendered and patched into
+    a copy of the composed surface (a new surface object, so the dirty-rect
+    renderer sees the change); ``overlay`` hands out the same surface until
+    then, so the whole HUD is a single blit per frame.
+    """
+
+    def __init__(self):
+        self.widgets = {}
+        self.surface = None
+        self.bounds = None  # Screen rect covered by self.surface
+        self._changed = {}  # Widget name -> screen rect it covered before the change
+        self.rebuilds = 0
+
+    def __contains__(self, name):
+        return name in self.widgets
+
+    def add(self, name, pos, font, color=(255, 255, 255)):
+        self.widgets[name] = TextWidget(pos, font, color)
+
+    def set(self, name, text, color=None):
+        widget = self.widgets[name]
+        old_rect = widget.rect
+        if widget.set(text, color) and name not in self._changed:
+            self._changed[name] = old_rect
+
+    def overlay(self):
+        """Return ``(surface, (x, y))`` for the composed HUD, or ``(None, None)`` if it is empty."""
+        if self._changed:
+            self._compose()
+        if self.surface is None:
+            return None, None
+        return self.surface, self.bounds.topleft
+
+    def _compose(self):
+        rects = [widget.rect for widget in self.widgets.values() if widget.surface is not None]
+        changed, self._changed = self._changed, {}
+        self.rebuilds += 1
+        if not rects:
+            self.surface = self.bounds = None
+            return
+        bounds = rects[0].unionall(rects[1:])
+        if self.surface is None or not self.bounds.contains(bounds):
+            # The HUD grew: compose every widget onto a new surface
+            self.bounds = bounds
+            self.surface = pygame.Surface(bounds.size, pygame.SRCALPHA)
+            redraw = self.widgets.values()
+        else:
+            # Patch just the changed widgets into a copy of the last surface
+            self.surface = self.surface.copy()
+            redraw = []
+            for name, old_rect in changed.items():
+                widget = self.widgets[name]
+                self.surface.fill((0, 0, 0, 0), old_rect.move(-self.bounds.x, -self.bounds.y))
+                redraw.append(widget)
+            # Redraw neighbours the cleared areas cut into
+            cleared = [old_rect for old_rect in changed.values()]
+            for name, widget in self.widgets.items():
+                if name not in changed and widget.surface is not None and widget.rect.collidelist(cleared) != -1:
+                    redraw.append(widget)
+        self.surface.blits([(widget.surface, widget.rect.move(-self.bounds.x, -self.bounds.y))
+                            for widget in redraw if widget.surface is not None], doreturn=False)
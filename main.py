@@ -1,19 +1,23 @@
 import pygame
 import random
-import time
 import threading
-import queue
-import os
+import argparse
 
 # Local imports
-from fish import load_fish_tiles, create_fish, Fish
-from collision_handler import CollisionHandler
-from ui import main_menu, pause_menu, game_over_menu, display_controls
-from shark import load_shark_image, spawn_shark, Shark
+from ui import main_menu, pause_menu, game_over_menu, display_controls, get_font
 from area_calculator import AreaCalculator
+from simulation import Simulation
+from renderer import DirtyRectRenderer, render_overlay
+from hud import Hud
+from spawn_scheduler import SpawnScheduler
+from asset_manager import assets, register_game_assets
+from entity_pool import format_id
+from event_log import events, DEBUG
+from profiler import profiler
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, CLIFF_RECT, INITIAL_FISH, FPS, FISH_BEHAVIOUR, FISH_BEHAVIOURS
 from sound import init_music, play_music, set_music_volume, pause_music, unpause_music, stop_music
 
-def main():
+def main(shark_count=1, fish_behaviour=None):
     # Initialize Pygame
     pygame.init()
     
@@ -29,39 +33,37 @@ def main():
         print(f"Error playing music: {e}")
     
     # Set up display
-    # Each tile is 16x16 pixels, and we have 63x50 tiles
-    # Real-world dimensions: 630cm x 500cm
-    screen_width, screen_height = 1008, 800
+    screen_width, screen_height = SCREEN_WIDTH, SCREEN_HEIGHT
     screen = pygame.display.set_mode((screen_width, screen_height))
     pygame.display.set_caption("Fish Frenzy")  # Updated to match UI title
     clock = pygame.time.Clock()
     
+    # Decode game assets in the background while the main menu is up;
+    # they are loaded once and shared by every game after that
+    register_game_assets(assets, screen_width, screen_height)
+    assets.preload(background=True)
+    
     # Main game loop with restart functionality
     game_active = True
     game_mode = "auto"  # Default game mode
     
     while game_active:
-        result, game_mode = run_game(screen, screen_width, screen_height, clock, game_mode)
+        result, game_mode = run_game(screen, screen_width, screen_height, clock, game_mode, shark_count,
+                                        fish_behaviour)
         game_active = result
 
+    # Report how long each asset took to load
+    for line in assets.report():
+        print(f"Asset {line}")
+    
     # Clean up before exit
     pygame.quit()
 
-# Define font 
-def get_font(size=24):
-    try:
-        return pygame.font.Font('assets/pixel_font.otf', size)
-    except pygame.error:
-        return pygame.font.Font(None, size)  # Use default font if pixel font not found
-
-def run_game(screen, screen_width, screen_height, clock, current_game_mode="auto"):
-    # Initialize the collision handler
-    collision_handler = CollisionHandler()
-    
+def run_game(screen, screen_width, screen_height, clock, current_game_mode="auto", shark_count=1,
+             fish_behaviour=None):
     # Game state variables
     running = True
     paused = False
-    score = 0
     
     # Display the main menu and get game mode
     menu_result, game_mode = main_menu()
@@ -72,32 +74,12 @@ def run_game(screen, screen_width, screen_height, clock, current_game_mode="auto
     if game_mode is None:
         game_mode = current_game_mode
     
-    # Load sound effects
-    try:
-        scream_sounds = [
-            pygame.mixer.Sound('assets/scream1.mp3'),
-            pygame.mixer.Sound('assets/scream2.mp3')
-        ]
-    except pygame.error as e:
-        print(f"Error loading sound effects: {e}")
-        scream_sounds = []
-    
-    # Load and split the fish tiles
-    try:
-        fish_list = load_fish_tiles("assets/fish_tiles.png")
-    except Exception:
-        # Fallback to assets/fish.png if the other path fails
-        fish_list = load_fish_tiles("assets/fish.png")
-    
-    # Load the cliff image and get its rectangle
-    try:
-        cliff_image = pygame.image.load('assets/cliff.png')
-    except pygame.error:
-        # Create a placeholder if cliff image can't be loaded
-        cliff_image = pygame.Surface((440, 150))
-        cliff_image.fill((139, 69, 19))  # Brown color
+    # Shared assets (loaded on the first game, reused on restarts)
+    scream_sounds = assets.get('scream_sounds')
+    fish_list = assets.get('fish_tiles')
+    cliff_image = assets.get('cliff')
     
-    cliff_rect = pygame.Rect(230, 490, 440, 150)  # Top left corner (x, y, width, height)
+    cliff_rect = pygame.Rect(CLIFF_RECT)  # Top left corner (x, y, width, height)
     
     # Initialize the area calculator with real-world dimensions
     area_calculator = AreaCalculator(screen_width, screen_height, cliff_rect)
@@ -106,233 +88,245 @@ def run_game(screen, screen_width, screen_height, clock, current_game_mode="auto
     last_calculation_time = 0
     calculation_interval = 5000  # 5 seconds in milliseconds
     area_results = None
+    area_future = None  # Pending calculation on the area workers
 
-    # Load and scale the map
-    try:
-        map_image = pygame.image.load("assets/seamap.png")
-        map_image = pygame.transform.scale(map_image, (screen_width, screen_height))
-    except pygame.error:
-        # Create a basic blue background if map can't be loaded
-        map_image = pygame.Surface((screen_width, screen_height))
-        map_image.fill((0, 120, 215))  # Ocean blue
+    # The map, already scaled to the screen
+    map_image = assets.get('map')
     
-    # Load the shark image and spawn one shark
-    shark_image = load_shark_image("assets/shark.png")
+    # Build the world (spawns the sharks)
+    shark_image = assets.get('shark')
     player_controlled = (game_mode == "player")
-    shark = spawn_shark(shark_image, screen_width, screen_height, player_controlled)
-    
-    # Initialize fish list
-    fish_objects = []
-    
-    # Fish counter for unique IDs
-    fish_counter = 0
+    sim = Simulation(fish_list, shark_image, screen_width, screen_height, cliff_rect, player_controlled,
+                     cliff_mask=assets.get('cliff_mask'), shark_count=shark_count,
+                     fish_behaviour=fish_behaviour or FISH_BEHAVIOUR[game_mode])
+    fish_objects = sim.fish
+    sim.coverage.set_zones(area_calculator.zone_rects())
     
     # Initial fish population
-    for i in range(10):
-        new_fish = create_fish(fish_list, screen_width, screen_height, cliff_rect)
-        new_fish.id = fish_counter  # Add a unique ID to each fish
-        fish_counter += 1
-        fish_objects.append(new_fish)
-        print(f"Initial fish #{new_fish.id} created at position ({new_fish.x:.1f}, {new_fish.y:.1f})")
+    for i in range(INITIAL_FISH):
+        fish_id = sim.spawn_fish()
+        x, y = fish_objects.position_of(fish_id)
+        events.debug("fish_spawned", id=format_id(fish_id), x=x, y=y, source="initial")
     
-    # Set up thread-safe communication for fish generation
-    fish_queue = queue.Queue(maxsize=20)
-    stop_event = threading.Event()
-    
-    # Modified fish_generator function for threading
-    def fish_generator_thread():
-        nonlocal fish_counter
-        thread_name = threading.current_thread().name
-        thread_id = threading.get_ident()
-        print(f"Fish generator thread started: {thread_name} (ID: {thread_id})")
-        
-        while not stop_event.is_set():
-            try:
-                # Create a new fish
-                new_fish = create_fish(fish_list, screen_width, screen_height, cliff_rect)
-                new_fish.id = fish_counter  # Add a unique ID to each fish
-                fish_counter += 1
-                
-                # Try to add it to the queue
-                try:
-                    fish_queue.put(new_fish, block=False)
-                    print(f"Fish #{new_fish.id} created by thread {thread_name} at position ({new_fish.x:.1f}, {new_fish.y:.1f})")
-                except queue.Full:
-                    print(f"Queue full, skipping fish #{new_fish.id}")
-                    pass  # Queue is full, skip this fish
-                
-                # Sleep for a bit before creating the next fish
-                time.sleep(1)
-            except Exception as e:
-                print(f"Error in fish generation: {e}")
-                time.sleep(1)  # Sleep to prevent spamming errors
-    
-    # Start fish generator thread
-    fish_gen_thread = threading.Thread(target=fish_generator_thread, name="FishGenerator")
-    fish_gen_thread.daemon = True  # Thread will terminate when main program exits
-    fish_gen_thread.start()
-    print(f"Main thread ID: {threading.get_ident()}")
+    events.info("game_started", mode=game_mode, main_thread_id=threading.get_ident())
     
     # Get the fonts - regular for score and smaller for area calculations
     font = get_font(24)
     small_font = get_font(18)
     
-    # Main game loop
-    while running:
-        current_time = pygame.time.get_ticks()
+    # Static background (map with the cliff) for the dirty-rect renderer
+    background = map_image.copy()
+    background.blit(cliff_image, cliff_rect)
+    renderer = DirtyRectRenderer(screen, background, profiler=profiler)
+    
+    # HUD text (score and area results) composed onto one cached surface;
+    # widgets are only re-rendered when their values change
+    hud = Hud()
+    hud.add("score", (10, 10), font)
+    area_font = area_calculator.results_font(small_font)
+    rendered_area_results = None
+    controls_overlay = (None, None)
+    if player_controlled:
+        controls_overlay = render_overlay(lambda surface: display_controls(surface, True), screen.get_size())
+    
+    # Fish arrivals, planned ahead on a background thread that is stopped
+    # on every way out of the game
+    spawner = SpawnScheduler(sim.plan_fish_batch)
+    spawner.start()
+    try:
+        # Main game loop
+        while running:
+            profiler.begin_frame()
         
-        # Calculate areas and cleaning time every 5 seconds
-        if current_time - last_calculation_time > calculation_interval:
-            # Calculate areas concurrently
-            areas, computation_time = area_calculator.calculate_all_areas_concurrent()
-            total_area = sum(areas.values())
-            cleaning_time = area_calculator.calculate_cleaning_time(total_area)
-            
-            # Store results for display
-            area_results = {
-                'areas': areas,
-                'total_area': total_area,
-                'cleaning_time': cleaning_time,
-                'computation_time': computation_time
-            }
-            
-            last_calculation_time = current_time
+            # Control the frame rate; the simulation consumes the real time that passed
+            frame_time = clock.tick(FPS) / 1000
+            current_time = pygame.time.get_ticks()
+            profiler.mark('wait')
         
-        # Get keyboard state for player control
-        keys = pygame.key.get_pressed()
+            # Calculate areas and cleaning time every 5 seconds on the area workers,
+            # picking the results up on a later frame instead of waiting for them
+            if area_future is None and current_time - last_calculation_time > calculation_interval:
+                area_future = area_calculator.submit_results()
+                last_calculation_time = current_time
+            if area_future is not None and area_future.done():
+                # Store results for display, with how much of the sea has been covered so far
+                area_results = area_future.result()
+                area_results['covered_area'] = sim.coverage.covered_area
+                area_future = None
+            profiler.mark('areas')
         
-        # Process events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-                stop_music()  # Stop music when quitting
-                return False, game_mode  # Exit the game completely
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_p or event.key == pygame.K_ESCAPE:
-                    paused = True
-                    pause_music()  # Pause the music
-                    pause_result = pause_menu()
-                    if pause_result == "resume":
-                        paused = False
-                        unpause_music()  # Resume the music
-                    elif pause_result == "restart":
-                        stop_event.set()  # Signal fish generator to stop
-                        return True, game_mode  # Restart the game
-                    elif pause_result == "exit":
-                        running = False
-                        stop_music()  # Stop music when exiting
-                        return False, game_mode  # Exit the game
-            # Add an event for music end
-            elif event.type == pygame.USEREVENT:
-                # This is the music end event, but we're using -1 for infinite looping so this shouldn't trigger
-                print("Music end event detected")
+            # Get keyboard state for player control
+            keys = pygame.key.get_pressed()
         
-        if not paused:
-            # Check for new fish in the queue
-            try:
-                while not fish_queue.empty():
-                    new_fish = fish_queue.get_nowait()
-                    fish_objects.append(new_fish)
-                    print(f"Fish #{new_fish.id} added to game from queue. Total fish: {len(fish_objects)}")
-            except queue.Empty:
-                pass  # No new fish, continue with game
-            
-            # Fill the screen
-            screen.blit(map_image, (0, 0))
+            # Process events
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                    stop_music()  # Stop music when quitting
+                    return False, game_mode  # Exit the game completely
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_F3:
+                        # Toggle the frame profiler overlay
+                        profiler.toggle_overlay()
+                        if not profiler.show_overlay:
+                            renderer.invalidate()
+                    elif event.key == pygame.K_h:
+                        # Toggle the coverage heatmap
+                        sim.coverage.toggle_overlay()
+                        if not sim.coverage.show_overlay:
+                            renderer.invalidate()
+                    elif event.key == pygame.K_p or event.key == pygame.K_ESCAPE:
+                        paused = True
+                        pause_music()  # Pause the music
+                        pause_result = pause_menu()
+                        if pause_result == "resume":
+                            paused = False
+                            unpause_music()  # Resume the music
+                            renderer.invalidate()  # The menu drew over the game
+                        elif pause_result == "restart":
+                            return True, game_mode  # Restart the game
+                        elif pause_result == "exit":
+                            running = False
+                            stop_music()  # Stop music when exiting
+                            return False, game_mode  # Exit the game
+                # Add an event for music end
+                elif event.type == pygame.USEREVENT:
+                    # This is the music end event, but we're using -1 for infinite looping so this shouldn't trigger
+                    events.info("music_ended")
+            profiler.mark('events')
+        
+            if not paused:
+                # Add the fish due to arrive by now
+                for new_fish in spawner.take(sim.time, len(fish_objects)):
+                    fish_id = sim.spawn_fish(new_fish)
+                    if events.enabled(DEBUG):
+                        events.debug("fish_spawned", id=format_id(fish_id), total=len(fish_objects), source="scheduler")
+                profiler.mark('spawn')
             
-            # Draw the cliff
-            screen.blit(cliff_image, cliff_rect)
+                # Simulation step: run as many fixed-dt ticks as the frame time
+                # allows (several per frame if rendering falls behind)
+                cliff_collisions = sim.cliff_collisions
+                eaten = sim.advance(frame_time, keys)
             
-            # Update shark position based on game mode
-            if player_controlled:
-                shark.handle_player_control(keys)
-                shark.keep_in_bounds(screen_width, screen_height)
-            else:
-                shark.move_towards_fish(fish_objects)
+                if sim.cliff_collisions > cliff_collisions and events.enabled(DEBUG):
+                    events.debug("shark_cliff_collision", count=sim.cliff_collisions - cliff_collisions)
             
-            # Check for collision between shark and cliff
-            if collision_handler.check_collision(shark, cliff_rect):
-                # Use shark's custom method instead of the general collision handler
-                shark.handle_cliff_collision()
-                print("Shark collided with cliff!")
-                
-            # Draw shark
-            shark.draw(screen)
+                if eaten and scream_sounds:
+                    # Randomly choose between the scream sounds
+                    random.choice(scream_sounds).play()
             
-            # Track which fish to remove (eaten by shark)
-            fish_to_remove = []
+                for fish_id in eaten:
+                    events.info("fish_eaten", id=format_id(fish_id), remaining=len(fish_objects), score=sim.score)
             
-            # Update fish movement
-            for fish in fish_objects:
-                fish.move(screen_width, screen_height)
+                # Render step (skipped while the window is minimized)
+                if pygame.display.get_active():
+                    # Update the HUD widgets (unchanged values cost nothing)
+                    hud.set("score", f"Score: {sim.score}")
                 
-                # Check for collision with the cliff
-                if collision_handler.check_collision(fish, cliff_rect):
-                    collision_handler.handle_collision(fish)
-                    
-                # Check for collision with shark
-                if shark.check_collision(fish):
-                    fish_to_remove.append(fish)
-                    score += 1
-                    if scream_sounds:
-                        # Randomly choose between the scream sounds
-                        random.choice(scream_sounds).play()
+                    # Display area calculation results if available
+                    if area_results is not rendered_area_results:
+                        lines = area_calculator.result_lines(
+                            area_results['areas'],
+                            area_results['total_area'],
+                            area_results['cleaning_time'],
+                            area_results['computation_time'],
+                            area_results['covered_area']
+                        )
+                        for i, (text, color, pos) in enumerate(lines):
+                            name = f"area_{i}"
+                            if name not in hud:
+                                hud.add(name, pos, area_font)
+                            hud.set(name, text, color)
+                        rendered_area_results = area_results
                 
-                # Draw fish
-                fish.draw(screen)
-            
-            # Remove fish that were eaten by the shark
-            for fish in fish_to_remove:
-                if fish in fish_objects:
-                    fish_objects.remove(fish)
-                    print(f"Fish #{fish.id} eaten by shark. Remaining fish: {len(fish_objects)}")
-            
-            # Draw score
-            score_text = font.render(f"Score: {score}", True, (255, 255, 255))
-            screen.blit(score_text, (10, 10))
-            
-            # Display controls for player mode
-            if player_controlled:
-                display_controls(screen, True)
-            
-            # Display area calculation results if available
-            if area_results:
-                area_calculator.display_results(
-                    screen, small_font, 
-                    area_results['areas'],
-                    area_results['total_area'],
-                    area_results['cleaning_time'],
-                    area_results['computation_time']
-                )
-            
-            # Update display
-            pygame.display.flip()
+                    # Sharks first, then the fish on top, then the HUD
+                    sprites = [(s.image, s.rect.topleft) for s in sim.sharks]
+                    sprites.extend(fish_objects.blit_sequence())
+                    overlays = [
+                        ("coverage",) + sim.coverage.overlay(),
+                        ("hud",) + hud.overlay(),
+                        ("controls", controls_overlay[0], controls_overlay[1]),
+                        ("profiler",) + profiler.overlay(),
+                    ]
+                    profiler.mark('hud')
+                
+                    # Restore and redraw only what changed, then update those rects
+                    renderer.render(sprites, overlays)
             
-            # Control the frame rate
-            clock.tick(60)
+                profiler.end_frame()
             
-            # Check for game over conditions (can be expanded)
-            if len(fish_objects) <= 0 and fish_queue.empty():
-                # Handle game over
-                stop_music()  # Stop music for game over
-                game_over_result = game_over_menu(score, game_mode)
-                if game_over_result == "restart":
-                    stop_event.set()  # Signal fish generator to stop
-                    # Restart the music for the new game
-                    try:
-                        play_music("assets/sofiathefirst_instrumental.mp3", loop=-1)
-                        set_music_volume(0.5)
-                    except pygame.error as e:
-                        print(f"Error restarting music: {e}")
-                    return True, game_mode  # Restart the game
-                else:  # Exit
-                    running = False
-                    return False, game_mode  # Exit the game
+                # Check for game over conditions (can be expanded)
+                if len(fish_objects) <= 0:
+                    # Handle game over
+                    stop_music()  # Stop music for game over
+                    game_over_result = game_over_menu(sim.score, game_mode)
+                    if game_over_result == "restart":
+                        # Restart the music for the new game
+                        try:
+                            play_music("assets/sofiathefirst_instrumental.mp3", loop=-1)
+                            set_music_volume(0.5)
+                        except pygame.error as e:
+                            print(f"Error restarting music: {e}")
+                        return True, game_mode  # Restart the game
+                    else:  # Exit
+                        running = False
+                        return False, game_mode  # Exit the game
+    finally:
+        spawner.close()
     
-    # Clean up before exit
-    stop_event.set()  # Signal fish generator to stop
-    print("Stopping fish generator thread...")
     return False, game_mode  # Exit the game
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fish Frenzy")
+    parser.add_argument("--headless", action="store_true",
+                        help="run the simulation without a window, menus or drawing")
+    parser.add_argument("--mode", choices=["auto", "player"], default="auto",
+                        help="shark control mode for headless runs")
+    parser.add_argument("--sharks", type=int, default=1,
+                        help="number of sharks; more than one hunts as a pack (multi-shark mode)")
+    parser.add_argument("--fish-behaviour", choices=FISH_BEHAVIOURS, default=None,
+                        help="how the fish swim (default: per game mode, see FISH_BEHAVIOUR in settings.py)")
+    parser.add_argument("--ticks", type=int, default=10000,
+                        help="maximum number of simulation ticks (headless)")
+    parser.add_argument("--fish", type=int, default=INITIAL_FISH,
+                        help="initial number of fish (headless)")
+    parser.add_argument("--spawn-every", type=int, default=FPS,
+                        help="ticks between fish spawns, 0 to disable (headless)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="random seed for reproducible runs (headless)")
+    parser.add_argument("--script", default=None,
+                        help='player-mode key script, e.g. "right:120,down+left:60" '
+                             '(default: chase the nearest fish)')
+    parser.add_argument("--log-file", default=None,
+                        help="write game events as JSON lines to this file "
+                             "(default: events.jsonl, or none when headless)")
+    parser.add_argument("--log-level", choices=["debug", "info", "warning", "error", "off"],
+                        default="info", help="lowest event level to record")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each frame phase (F3 shows the stats in game; "
+                             "headless runs print them)")
+    parser.add_argument("--profile-csv", default=None,
+                        help="dump per-frame phase timings to this CSV file")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    events.set_level(args.log_level)
+    log_file = args.log_file if args.log_file or args.headless else "events.jsonl"
+    if log_file:
+        events.open(log_file)
+    if args.profile:
+        profiler.enable()
+    if args.profile_csv:
+        profiler.start_csv(args.profile_csv)
+    if args.headless:
+        from headless import init_headless, run_headless, print_summary
+        init_headless()
+        print_summary(run_headless(args.mode, args.ticks, args.fish, args.spawn_every,
+                                   args.seed, args.script, shark_count=args.sharks,
+                                   fish_behaviour=args.fish_behaviour))
+        pygame.quit()
+    else:
+        main(args.sharks, args.fish_behaviour)
+    profiler.stop_csv()
+    events.close()
@@ -0,0 +1,214 @@
+import numpy as np
+import pygame
+
+from grid_cells import grid_shape, cells_of, expand_runs
+
+
+class ObstacleMap:
+    """Broadphase index of the static obstacles on a map (the cliff, rocks).
+
+    The screen is cut into square cells. For each entity size queried, every
+    obstacle is filed under each cell where the top-left corner of an
+    entity of that size could sit while touching it, as one flat array of
+    obstacle indices grouped by cell. A query then looks up a single cell
+    per entity and only tests the obstacles filed there, so its cost
+    depends on how crowded that cell is, not on how many obstacles the map
+    has. Tables are built once per size and rebuilt lazily after the
+    obstacles change.
+
+    An obstacle may carry a ``pygame.mask.Mask`` of its opaque pixels (the
+    size of its rect); then only those pixels collide. Rect overlaps are
+    still found first, so masks cost nothing for entities nowhere near an
+    obstacle. Candidates that overlap a masked obstacle's rect are then
+    looked up, in one vectorized step, in hit maps that tell for every
+    offset whether the entity's own mask touches the obstacle's pixels
+    (see ``_hit_maps``).
+
+    Obstacles are identified by their index in ``obstacles``; when an
+    entity touches several, the lowest index wins, the same answer as
+    testing the obstacles in order.
+    """
+
+    def __init__(self, width, height, obstacles=(), cell_size=32):
+        self.cell_size = cell_size
+        self.cols, self.rows = grid_shape(width, height, cell_size)
+        self.obstacles = [tuple(rect) for rect in obstacles]
+        self.masks = [None] * len(self.obstacles)  # Optional pygame.mask.Mask per obstacle
+        self._masked = set()  # Indices of the obstacles with masks
+        self._maps = {}  # (obstacle index, entity width, entity height) -> (entity masks, hit maps), see _hit_maps
+        self._rects = None  # (left, top, right, bottom) arrays, built on demand
+        self._tables = {}  # (width, height) -> (cell start offsets, obstacle indices by cell)
+
+    def __len__(self):
+        return len(self.obstacles)
+
+    def add(self, rect, mask=None):
+        """Add an obstacle (with an optional pixel mask) and return its index."""
+        self.obstacles.append(tuple(rect))
+        self.masks.append(None)
+        self._rects = None
+        self._tables.clear()
+        index = len(self.obstacles) - 1
+        if mask is not None:
+            self.set_mask(index, mask)
+        return index
+
+    def set_obstacles(self, rects):
+        self.obstacles = [tuple(rect) for rect in rects]
+        self.masks = [None] * len(self.obstacles)
+        self._masked.clear()
+        self._maps.clear()
+        self._rects = None
+        self._tables.clear()
+
+    def set_mask(self, index, mask):
+        """Make only the set pixels of ``mask`` (None for the whole rect) of an obstacle collide."""
+        if mask is not None and mask.get_size() != tuple(self.obstacles[index][2:]):
+            raise ValueError(f"mask size {mask.get_size()} doesn't match obstacle {self.obstacles[index]}")
+        self.masks[index] = mask
+        for key in [key for key in self._maps if key[0] == index]:
+            del self._maps[key]
+        if mask is None:
+            self._masked.discard(index)
+        else:
+            self._masked.add(index)
+
+    def _table(self, width, height):
+        table = self._tables.get((width, height))
+        if table is not None:
+            return table
+        if self._rects is None:
+            rects = np.array(self.obstacles, dtype=np.int64).reshape(-1, 4)
+            left, top = rects[:, 0], rects[:, 1]
+            self._rects = (left, top, left + rects[:, 2], top + rects[:, 3])
+        left, top, right, bottom = self._rects
+
+        # An entity touches an obstacle iff its corner is in (left - width, right) x (top - height, bottom).
+        # Clamping both those corner ranges and the entities' cells to the grid keeps every hit in a shared cell;
+        # the ranges reach one pixel further right and down in case cells_of rounds a corner up a cell.
+        size = self.cell_size
+        cx0 = np.clip((left - width + 1) // size, 0, self.cols - 1)
+        cx1 = np.clip(right // size, 0, self.cols - 1)
+        cy0 = np.clip((top - height + 1) // size, 0, self.rows - 1)
+        cy1 = np.clip(bottom // size, 0, self.rows - 1)
+        cells, members = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+        for index in np.flatnonzero((right > left) & (bottom > top)).tolist():
+            cx = np.arange(cx0[index], cx1[index] + 1)
+            cy = np.arange(cy0[index], cy1[index] + 1)
+            covered = (cy[:, None] * self.cols + cx[None, :]).ravel()
+            cells.append(covered)
+            members.append(np.full(len(covered), index, dtype=np.int64))
+        cells = np.concatenate(cells)
+        members = np.concatenate(members)
+
+        # Group by cell (stable, so each cell lists its obstacles in index order)
+        members = members[np.argsort(cells, kind='stable')]
+        start = np.concatenate([[0], np.cumsum(np.bincount(cells, minlength=self.cols * self.rows))])
+        table = self._tables[(width, height)] = (start, members)
+        return table
+
+    def hits(self, xs, ys, width, height, variants=None, masks=None):
+        """Obstacle hit by each ``width`` x ``height`` rect at (``xs``, ``ys``), or -1.
+
+        Positions are truncated to integer pixels like ``pygame.Rect``.
+        Against masked obstacles an entity's own pixels can be given as
+        ``masks[variants[i]]`` (e.g. a FishAtlas's masks and the swarm's
+        sprite column); without them its whole rect counts.
+        Returns an int64 array with one entry per rect.
+        """
+        start, members = self._table(width, height)
+        hit = np.full(len(xs), -1, dtype=np.int64)
+        if len(members) == 0 or len(xs) == 0:
+            return hit
+        cells = cells_of(xs, ys, self.cell_size, self.cols, self.rows)
+
+        # Only entities in cells with obstacles filed go on to the exact test
+        first = start[cells]
+        counts = start[cells + 1] - first
+        entity = np.flatnonzero(counts)
+        if len(entity) == 0:
+            return hit
+        first, counts = first[entity], counts[entity]
+
+        # One candidate pair per (entity, obstacle filed under its cell)
+        pair_entity = np.repeat(entity, counts)
+        obstacle = members[expand_runs(first, counts)]
+
+        left = np.asarray(xs)[pair_entity].astype(np.int64)
+        top = np.asarray(ys)[pair_entity].astype(np.int64)
+        o_left, o_top, o_right, o_bottom = self._rects
+        overlap = ((left < o_right[obstacle]) & (left + width > o_left[obstacle]) &
+                   (top < o_bottom[obstacle]) & (top + height > o_top[obstacle]))
+        pair_entity, obstacle = pair_entity[overlap], obstacle[overlap]
+        left, top = left[overlap], top[overlap]
+        if self._masked:
+            keep = self._pixel_hits(pair_entity, obstacle, left, top, width, height, variants, masks)
+            pair_entity, obstacle = pair_entity[keep], obstacle[keep]
+
+        # Pairs run in obstacle index order per entity, so the first pair of each entity wins
+        winner = np.ones(len(pair_entity), dtype=bool)
+        winner[1:] = pair_entity[1:] != pair_entity[:-1]
+        hit[pair_entity[winner]] = obstacle[winner]
+        return hit
+
+    def _pixel_hits(self, pair_entity, obstacle, left, top, width, height, variants, masks):
+        """Which rect-overlapping (entity, obstacle) pairs also touch at pixel level."""
+        keep = np.ones(len(obstacle), dtype=bool)
+        if len(obstacle) == 0:
+            return keep
+        o_left, o_top = self._rects[:2]
+        for index in np.unique(obstacle).tolist():
+            if index not in self._masked:
+                continue
+            hit_maps = self._hit_maps(index, width, height, masks)
+            pairs = np.flatnonzero(obstacle == index)
+            variant = np.asarray(variants)[pair_entity[pairs]] if masks is not None else 0
+            keep[pairs] = hit_maps[variant, top[pairs] - o_top[index] + height - 1,
+                                   left[pairs] - o_left[index] + width - 1]
+        return keep
+
+    def _hit_maps(self, index, width, height, masks):
+        """Per entity mask, which corner offsets against a masked obstacle collide.
+
+        ``maps[v, y + height - 1, x + width - 1]`` tells whether ``masks[v]``
+        (or the whole rect, without masks) placed at offset (x, y) from the
+        obstacle's corner overlaps its set pixels. ``Mask.convolve`` builds
+        each map in one go; they are cached per entity size until the masks
+        change.
+        """
+        cached = self._maps.get((index, width, height))
+        if cached is not None and cached[0] is masks:
+            return cached[1]
+        obstacle_mask = self.masks[index]
+        entity_masks = masks if masks is not None else [pygame.mask.Mask((width, height), fill=True)]
+        maps = np.stack([_mask_bits(obstacle_mask.convolve(mask)) for mask in entity_masks])
+        self._maps[(index, width, height)] = (masks, maps)
+        return maps
+
+    def hit(self, rect, mask=None):
+        """Index of the first obstacle ``rect`` (a pygame.Rect) overlaps, or -1.
+
+        ``mask`` is the entity's own pixel mask, tested against masked obstacles.
+        """
+        start, members = self._table(rect.width, rect.height)
+        size = self.cell_size
+        cx = min(max(rect.left // size, 0), self.cols - 1)
+        cy = min(max(rect.top // size, 0), self.rows - 1)
+        cell = cy * self.cols + cx
+        for index in members[start[cell]:start[cell + 1]].tolist():
+            if not rect.colliderect(self.obstacles[index]):
+                continue
+            obstacle_mask = self.masks[index]
+            if obstacle_mask is None:
+                return index
+            ox, oy = self.obstacles[index][:2]
+            if mask is None:
+                mask = pygame.mask.Mask(rect.size, fill=True)
+            if obstacle_mask.overlap(mask, (rect.x - ox, rect.y - oy)) is not None:
+                return index
+        return -1
+
+
+def _mask_bits(mask):
+    """A mask as a boolean array indexed ``[y, x]``."""
+    return pygame.surfarray.array_red(mask.to_surface()).T > 0
@@ -0,0 +1,156 @@
+import csv
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+from ui import get_font
+
+perf_counter_ns = time.perf_counter_ns
+
+
+class FrameProfiler:
+    """Times the phases of each frame and keeps rolling percentiles per phase.
+
+    Call ``begin_frame`` at the top of the frame, ``mark(name)`` at the end
+    of every phase (the time since the previous mark is charged to
+    ``name``; repeated marks within a frame add up) and ``end_frame`` at the
+    bottom. The last ``window`` frames are kept for p50/p95/p99. When
+    disabled every call returns immediately.
+    """
+
+    def __init__(self, window=300, enabled=False):
+        self.window = window
+        self.enabled = enabled
+        self.show_overlay = False
+        self.history = {}  # Phase name -> deque of durations (ns)
+        self.frame_count = 0
+
+        self._frame = {}
+        self._frame_start = 0
+        self._last = 0
+
+        self._csv_file = None
+        self._csv_writer = None
+        self._csv_phases = None
+
+        self._overlay = None
+        self._overlay_frame = -1
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+        if not enabled:
+            self.show_overlay = False
+
+    def toggle_overlay(self):
+        """Show or hide the on-screen stats; showing them also turns profiling on."""
+        self.show_overlay = not self.show_overlay
+        if self.show_overlay:
+            self.enabled = True
+
+    def reset(self):
+        self.history = {}
+        self.frame_count = 0
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        now = perf_counter_ns()
+        self._frame = {}
+        self._frame_start = now
+        self._last = now
+
+    def mark(self, name):
+        if not self.enabled:
+            return
+        now = perf_counter_ns()
+        frame = self._frame
+        frame[name] = frame.get(name, 0) + now - self._last
+        self._last = now
+
+    def end_frame(self):
+        if not self.enabled or not self._frame_start:
+            return
+        frame = self._frame
+        frame['frame'] = perf_counter_ns() - self._frame_start
+        for name, duration in frame.items():
+            samples = self.history.get(name)
+            if samples is None:
+                samples = self.history[name] = deque(maxlen=self.window)
+            samples.append(duration)
+        if self._csv_writer is not None:
+            self._write_csv_row(frame)
+        self.frame_count += 1
+        self._frame_start = 0
+
+    def percentiles(self, name):
+        """Return (p50, p95, p99) of a phase in milliseconds over the rolling window."""
+        samples = self.history.get(name)
+        if not samples:
+            return 0.0, 0.0, 0.0
+        p50, p95, p99 = np.percentile(np.fromiter(samples, dtype=np.float64), [50, 95, 99])
+        return float(p50) / 1e6, float(p95) / 1e6, float(p99) / 1e6
+
+    def stats(self):
+        """Return ``{phase: (p50, p95, p99)}`` in milliseconds for every phase seen."""
+        return {name: self.percentiles(name) for name in self.history}
+
+    def start_csv(self, path):
+        """Dump one CSV row per frame (durations in microseconds) until ``stop_csv``."""
+        self.stop_csv()
+        self.enabled = True
+        self._csv_file = open(path, 'w', newline='')
+        self._csv_writer = csv.writer(self._csv_file)
+        self._csv_phases = None
+
+    def _write_csv_row(self, frame):
+        if self._csv_phases is None:
+            # Columns come from the first profiled frame
+            self._csv_phases = list(frame)
+            self._csv_writer.writerow(['frame_index'] + [f"{name}_us" for name in self._csv_phases])
+        self._csv_writer.writerow([self.frame_count] +
+                                  [frame.get(name, 0) // 1000 for name in self._csv_phases])
+
+    def stop_csv(self):
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = None
+            self._csv_writer = None
+
+    def overlay(self, refresh_every=15):
+        """Return ``(surface, (x, y))`` for the stats overlay, or ``(None, None)`` when hidden.
+
+        The surface is rebuilt only every ``refresh_every`` frames so the
+        overlay itself costs little.
+        """
+        if not self.show_overlay or not self.history:
+            return None, None
+        if self._overlay is None or self.frame_count - self._overlay_frame >= refresh_every:
+            self._overlay = self._render_overlay()
+            self._overlay_frame = self.frame_count
+        return self._overlay, (pygame.display.get_surface().get_width() - self._overlay.get_width() - 10, 10)
+
+    def _render_overlay(self):
+        font = get_font(16, None)
+        rows = [("phase", "p50", "p95", "p99")]
+        for name, values in self.stats().items():
+            rows.append((name,) + tuple(f"{value:.2f}" for value in values))
+        # Phase names left-aligned, then three right-aligned millisecond columns
+        line_height = font.get_linesize()
+        name_width, column_width = 90, 50
+        width = name_width + column_width * 3 + 10
+        panel = pygame.Surface((width, line_height * len(rows) + 10), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 160))
+        for i, row in enumerate(rows):
+            y = 5 + i * line_height
+            color = (255, 255, 100) if i == 0 else (255, 255, 255)
+            panel.blit(font.render(row[0], True, color), (5, y))
+            for j, cell in enumerate(row[1:]):
+                text = font.render(cell, True, color)
+                panel.blit(text, (5 + name_width + column_width * (j + 1) - text.get_width(), y))
+        return panel
+
+
+# Process-wide profiler used by the game loop
+profiler = FrameProfiler()
@@ -0,0 +1,118 @@
+import pygame
+
+
+def render_overlay(draw, size):
+    """Draw onto a transparent surface and crop it to what was drawn.
+
+    ``draw`` is called with a screen-sized SRCALPHA surface (e.g. a HUD
+    function that normally draws straight onto the screen). Returns
+    ``(surface, topleft)``, or ``(None, None)`` if nothing was drawn.
+    """
+    canvas = pygame.Surface(size, pygame.SRCALPHA)
+    draw(canvas)
+    bounds = canvas.get_bounding_rect()
+    if bounds.width == 0 or bounds.height == 0:
+        return None, None
+    return canvas.subsurface(bounds).copy(), bounds.topleft
+
+
+class DirtyRectRenderer:
+    """Redraws only the parts of the screen that changed since the last frame.
+
+    Each frame the background is restored under every sprite's old and new
+    position, the sprites are redrawn, and HUD overlays are redrawn when
+    their content changed or a sprite moved underneath them. Only those
+    rects are pushed with ``pygame.display.update``. When the dirty area
+    gets too big, a full redraw and ``flip`` is cheaper and is used instead.
+    """
+
+    def __init__(self, screen, background, max_dirty_fraction=0.4, max_dirty_rects=400, profiler=None):
+        self.screen = screen
+        self.profiler = profiler  # Optional FrameProfiler; 'draw' and 'flip' are marked
+        self.background = background
+        self.max_dirty_area = int(screen.get_width() * screen.get_height() * max_dirty_fraction)
+        self.max_dirty_rects = max_dirty_rects
+
+        self.previous_rects = []  # Sprite rects drawn last frame
+        self.previous_overlays = {}  # Overlay key -> (surface, rect) drawn last frame
+        self.full_redraw = True
+
+        # Stats for the last frame
+        self.last_dirty_rects = 0
+        self.last_was_full = True
+
+    def invalidate(self):
+        """Force a full redraw on the next frame (e.g. after a menu covered the screen)."""
+        self.full_redraw = True
+
+    def render(self, sprites, overlays=()):
+        """Draw a frame.
+
+        ``sprites`` is a list of ``(surface, (x, y))`` pairs, drawn in order.
+        ``overlays`` is a sequence of ``(key, surface, (x, y))`` HUD layers
+        drawn on top; an overlay counts as changed when its surface object
+        or position differs from the last frame under the same key.
+        """
+        screen = self.screen
+        new_rects = [pygame.Rect(pos, surface.get_size()) for surface, pos in sprites]
+        overlays = [(key, surface, pygame.Rect(pos, surface.get_size()))
+                    for key, surface, pos in overlays if surface is not None]
+
+        dirty = self.previous_rects + new_rects
+        changed = set()
+        for key, surface, rect in overlays:
+            previous = self.previous_overlays.get(key)
+            if previous is None or previous[0] is not surface or previous[1] != rect:
+                changed.add(key)
+                if previous is not None:
+                    dirty.append(previous[1])
+        # Overlays that disappeared leave their old area dirty
+        current_keys = {key for key, _, _ in overlays}
+        for key, (surface, rect) in self.previous_overlays.items():
+            if key not in current_keys:
+                dirty.append(rect)
+
+        # Redraw changed overlays and any overlay touching a dirty rect. The
+        # background under a redrawn overlay is restored too (so translucent
+        # edges don't build up), which can in turn dirty a neighbour.
+        redraw = set()
+        pending = True
+        while pending:
+            pending = False
+            for key, surface, rect in overlays:
+                if key not in redraw and (key in changed or rect.collidelist(dirty) != -1):
+                    redraw.add(key)
+                    dirty.append(rect)
+                    pending = True
+        redraw_overlays = [(surface, rect) for key, surface, rect in overlays if key in redraw]
+
+        if not self.full_redraw:
+            area = sum(rect.width * rect.height for rect in dirty)
+            if area > self.max_dirty_area or len(dirty) > self.max_dirty_rects:
+                self.full_redraw = True
+
+        if self.full_redraw:
+            screen.blit(self.background, (0, 0))
+            screen.blits(sprites, doreturn=False)
+            screen.blits([(surface, rect) for _, surface, rect in overlays], doreturn=False)
+            if self.profiler is not None:
+                self.profiler.mark('draw')
+            pygame.display.flip()
+            self.last_dirty_rects = 0
+            self.last_was_full = True
+        else:
+            background = self.background
+            screen.blits([(background, rect, rect) for rect in dirty], doreturn=False)
+            screen.blits(sprites, doreturn=False)
+            screen.blits(redraw_overlays, doreturn=False)
+            if self.profiler is not None:
+                self.profiler.mark('draw')
+            pygame.display.update(dirty)
+            self.last_dirty_rects = len(dirty)
+            self.last_was_full = False
+
+        self.previous_rects = new_rects
+        self.previous_overlays = {key: (surface, rect) for key, surface, rect in overlays}
+        self.full_redraw = False
+        if self.profiler is not None:
+            self.profiler.mark('flip')
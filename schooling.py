@@ -0,0 +1,206 @@
+import numpy as np
+
+from fish_swarm import FISH_SIZE, UP, DOWN, LEFT, RIGHT
+from grid_cells import grid_shape, cells_of, sort_by_cell, expand_runs
+
+
+class Schooling:
+    """Boids steering for a whole FishSwarm: separation, alignment, cohesion and flight.
+
+    Installed as a swarm's ``behaviour``, it replaces the random walk: each
+    fish keeps a velocity (the swarm's ``vx``/``vy`` columns) and every tick
+    steers it towards the average heading and centre of its neighbours,
+    away from fish crowding it, away from nearby sharks and from the screen
+    edges, with a little random jitter so schools don't freeze into one
+    rigid formation.
+
+    Neighbours are counted per grid cell rather than per pair, so a tick
+    costs O(fish + cells) however dense the school. Counts, position sums
+    and velocity sums are binned per cell with ``np.bincount`` and summed
+    over each 3x3 block of cells; every fish then reads its block's totals
+    (less its own contribution). Alignment and cohesion use the swarm's
+    SpatialGrid cells (64 px). Separation needs real distances, but only
+    between fish less than ``separation_radius`` apart: those pairs are
+    found on a grid of that cell size, and each pushes its two fish apart
+    in proportion to how far inside the radius they are, so the closest
+    neighbours push hardest and fish further away not at all. Sharks are
+    few, so fleeing uses an exact ``SpatialGrid.pairs_near`` query.
+    """
+
+    def __init__(self, cohesion=0.002, alignment=0.1, separation=0.2, separation_radius=16,
+                 flee=0.6, flee_radius=120, flee_boost=1.75, min_speed=0.75, edge_margin=32, edge_turn=0.3,
+                 jitter=0.04, cell_size=64):
+        self.cohesion = cohesion  # Pull towards the neighbours' centre, per pixel away
+        self.alignment = alignment  # Fraction of the heading difference corrected per tick
+        self.separation = separation  # Push per pixel closer than separation_radius to a neighbour
+        self.separation_radius = separation_radius  # Pixels within which fish keep apart
+        self.flee = flee  # Push away from a shark right next to the fish
+        self.flee_radius = flee_radius  # Pixels within which fish notice a shark
+        self.flee_boost = flee_boost  # Top speed of fleeing fish, in multiples of their own speed
+        self.min_speed = min_speed  # Slowest a fish swims, in multiples of its own speed
+        self.edge_margin = edge_margin
+        self.edge_turn = edge_turn
+        self.jitter = jitter
+        self.cell_size = cell_size  # Neighbourhood cells without a SpatialGrid attached
+
+    def steer(self, swarm, screen_width, screen_height, threats=None):
+        """Steer and move every fish one tick, keeping them on screen.
+
+        ``threats`` are ``(xs, ys)`` arrays of shark centres to flee from.
+        Sets each fish's direction code to the axis it mostly swims along.
+        """
+        n = swarm.count
+        x, y = swarm.x[:n], swarm.y[:n]
+        vx, vy = swarm.vx[:n], swarm.vy[:n]
+        speed = swarm.speed[:n]
+        ax = np.zeros(n)
+        ay = np.zeros(n)
+
+        # Alignment and cohesion over the neighbour grid's 3x3 blocks
+        grid = swarm.index
+        if grid is not None:
+            cells, cols, rows = grid.cell_of_row[:n], grid.cols, grid.rows
+        else:
+            cols, rows = grid_shape(screen_width, screen_height, self.cell_size)
+            cells = cells_of(x, y, self.cell_size, cols, rows)
+        count, sum_x, sum_y, sum_vx, sum_vy = _block_sums(cells, cols, rows, (x, y, vx, vy))
+        others = count - 1
+        has = others > 0
+        inv = np.zeros(n)
+        inv[has] = 1.0 / others[has]
+        ax += ((sum_vx - vx) * inv - vx) * has * self.alignment
+        ay += ((sum_vy - vy) * inv - vy) * has * self.alignment
+        ax += ((sum_x - x) * inv - x) * has * self.cohesion
+        ay += ((sum_y - y) * inv - y) * has * self.cohesion
+
+        # Separation: every pair closer than the radius pushes apart, harder the closer it is
+        radius = self.separation_radius
+        first, second = _close_pairs(x, y, radius, screen_width, screen_height)
+        dx = x[first] - x[second]
+        dy = y[first] - y[second]
+        # Squared distances pick the close pairs (np.hypot is far slower than this)
+        distance = dx * dx + dy * dy
+        close = (distance < radius * radius) & (distance > 0)
+        first, second, dx, dy = first[close], second[close], dx[close], dy[close]
+        distance = np.sqrt(distance[close])
+        push = self.separation * (radius - distance) / distance
+        push_x, push_y = dx * push, dy * push
+        ax += np.bincount(first, weights=push_x, minlength=n) - np.bincount(second, weights=push_x, minlength=n)
+        ay += np.bincount(first, weights=push_y, minlength=n) - np.bincount(second, weights=push_y, minlength=n)
+
+        # Flee from sharks, harder the closer they are
+        limit = speed.copy()
+        if threats is not None and grid is not None and len(threats[0]):
+            fleeing = self._flee(swarm, threats, ax, ay)
+            limit[fleeing] *= self.flee_boost
+
+        # Turn back from the screen edges
+        margin = self.edge_margin
+        ax[x < margin] += self.edge_turn
+        ax[x > screen_width - FISH_SIZE - margin] -= self.edge_turn
+        ay[y < margin] += self.edge_turn
+        ay[y > screen_height - FISH_SIZE - margin] -= self.edge_turn
+
+        jitter = swarm.rng.normal(0.0, self.jitter, size=(2, n))
+        vx += ax + jitter[0]
+        vy += ay + jitter[1]
+
+        # Keep every fish between its slowest and its top speed
+        norm = np.sqrt(vx * vx + vy * vy)
+        np.maximum(norm, 1e-9, out=norm)
+        scale = np.clip(norm, speed * self.min_speed, limit) / norm
+        vx *= scale
+        vy *= scale
+
+        x += vx
+        y += vy
+
+        # Clamp to the screen, swimming back inwards
+        max_x = screen_width - FISH_SIZE
+        max_y = screen_height - FISH_SIZE
+        hit = x < 0
+        x[hit] = 0
+        vx[hit] = np.abs(vx[hit])
+        hit = x > max_x
+        x[hit] = max_x
+        vx[hit] = -np.abs(vx[hit])
+        hit = y < 0
+        y[hit] = 0
+        vy[hit] = np.abs(vy[hit])
+        hit = y > max_y
+        y[hit] = max_y
+        vy[hit] = -np.abs(vy[hit])
+
+        swarm.direction[:n] = np.where(np.abs(vx) >= np.abs(vy),
+                                       np.where(vx < 0, LEFT, RIGHT),
+                                       np.where(vy < 0, UP, DOWN))
+
+    def _flee(self, swarm, threats, ax, ay):
+        """Add the push away from nearby sharks to ``ax``/``ay``; returns the fleeing rows."""
+        grid = swarm.index
+        threat_x = np.asarray(threats[0], dtype=np.float64)
+        threat_y = np.asarray(threats[1], dtype=np.float64)
+        reach = -(-self.flee_radius // grid.cell_size)
+        points, rows = grid.pairs_near(threat_x, threat_y, reach)
+        half = FISH_SIZE / 2
+        dx = swarm.x[rows] + half - threat_x[points]
+        dy = swarm.y[rows] + half - threat_y[points]
+        distance = dx * dx + dy * dy
+        near = (distance < self.flee_radius * self.flee_radius) & (distance > 0)
+        rows, dx, dy = rows[near], dx[near], dy[near]
+        distance = np.sqrt(distance[near])
+        # Unit vector away from the shark, fading out towards the flee radius
+        push = self.flee * (1.0 - distance / self.flee_radius) / distance
+        n = len(ax)
+        ax += np.bincount(rows, weights=dx * push, minlength=n)
+        ay += np.bincount(rows, weights=dy * push, minlength=n)
+        return np.unique(rows)
+
+
+def _close_pairs(x, y, radius, width, height):
+    """Index arrays ``(first, second)`` of the candidate pairs for distances under ``radius``.
+
+    Positions are sorted by their cell on a grid of ``radius``-sized cells.
+    Each position then pairs with the positions after it in its own cell
+    and the next one (one contiguous run of the sorted order) and with the
+    three cells below (another run), so every pair within ``radius`` comes
+    up exactly once.
+    """
+    cols, rows = grid_shape(width, height, radius)
+    cells = cells_of(x, y, radius, cols, rows)
+    order, start = sort_by_cell(cells, cols * rows)
+    cells = cells[order]
+    cx, cy = cells % cols, cells // cols
+    position = np.arange(len(cells))
+
+    # Run 1: the rest of the own cell, plus the cell to the right
+    first_1 = position + 1
+    end_1 = start[cells + 1 + (cx < cols - 1)]
+    # Run 2: the three cells of the row below
+    below = cy < rows - 1
+    base = (cy + 1) * cols
+    first_2 = np.where(below, start[np.minimum(base + np.maximum(cx - 1, 0), cols * rows)], 0)
+    end_2 = np.where(below, start[np.minimum(base + np.minimum(cx + 1, cols - 1) + 1, cols * rows)], 0)
+
+    counts = np.concatenate([end_1 - first_1, end_2 - first_2])
+    second = expand_runs(np.concatenate([first_1, first_2]), counts)
+    first = np.repeat(np.concatenate([position, position]), counts)
+    return order[first], order[second]
+
+
+def _block_sums(cells, cols, rows, values):
+    """Per position, the fish count and the sums of ``values`` over its cell's 3x3 block."""
+    size = cols * rows
+    # One bincount for the counts and every value, each in its own layer of cells
+    layers = len(values) + 1
+    keys = (cells + np.arange(layers)[:, None] * size).ravel()
+    weights = np.concatenate([np.ones(len(cells))] + [np.asarray(v, dtype=np.float64) for v in values])
+    grid = np.bincount(keys, weights=weights, minlength=layers * size).reshape(layers, rows, cols)
+    padded = np.zeros((layers, rows + 2, cols + 2))
+    padded[:, 1:-1, 1:-1] = grid
+    # Sum the 3x3 neighbourhood of every cell with nine shifted slices
+    block = np.zeros((layers, rows, cols))
+    for dy in range(3):
+        for dx in range(3):
+            block += padded[:, dy:dy + rows, dx:dx + cols]
+    return list(block.reshape(layers, size)[:, cells])
@@ -0,0 +1,34 @@
+# Shared game settings
+
+# Each tile is 16x16 pixels, and we have 63x50 tiles
+# Real-world dimensions: 630cm x 500cm
+SCREEN_WIDTH, SCREEN_HEIGHT = 1008, 800
+
+# Cliff position and size (x, y, width, height)
+CLIFF_RECT = (230, 490, 440, 150)
+
+# Fish present when a game starts
+INITIAL_FISH = 10
+
+# Target frame rate of the windowed game
+FPS = 60
+
+# Fixed simulation timestep (seconds); movement speeds are pixels per step
+SIM_DT = 1 / 60
+
+# Most simulation steps run for one rendered frame before the backlog is dropped
+MAX_STEPS_PER_FRAME = 5
+
+# Longest frame time fed to the simulation (e.g. after a pause menu)
+MAX_FRAME_TIME = 0.25
+
+# Fish arrivals during a game: fish per simulated second, how many arrive
+# together, and the most fish alive at once (None for no limit)
+SPAWN_RATE = 1.0
+SPAWN_BURST = 1
+SPAWN_CAP = None
+
+# How fish swim in each game mode: 'random_walk' (a random turn every half
+# second) or 'schooling' (boids schools that flee the sharks)
+FISH_BEHAVIOUR = {'auto': 'random_walk', 'player': 'random_walk'}
+FISH_BEHAVIOURS = ('random_walk', 'schooling')
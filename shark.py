@@ -7,12 +7,18 @@ class Shark:
         self.original_image = pygame.transform.scale(image, (30, 30))  # Slightly larger than fish
         self.image = self.original_image
         self.flipped_image = pygame.transform.flip(self.original_image, True, False)  # Flip horizontally
+        # One collision mask covering both facings, so turning around (as
+        # handle_cliff_collision does) never makes the shark overlap anything new
+        self.mask = pygame.mask.from_surface(self.original_image)
+        self.mask.draw(pygame.mask.from_surface(self.flipped_image), (0, 0))
         self.x = x
         self.y = y
         self.rect = self.image.get_rect(topleft=(x, y))
         self.speed = 2
         self.player_speed = 4  # Higher speed for player control
         self.target_fish = None
+        self.target_id = None  # Entity ID of the target when chasing a FishSwarm
+        self.targeting = 'sticky'  # 'sticky': chase a fish until it is eaten; 'nearest': re-pick every move
         self.facing_right = True  # Track which direction shark is facing
         self.player_controlled = player_controlled  # New flag for player control
         
@@ -87,84 +93,114 @@ class Shark:
         
         # If we're in collision recovery mode, move in the current direction
         if self.collision_recovery > 0:
-            self.collision_recovery -= 1
+            self._recover()
+            return
             
-            # Move based on current direction
-            self.x += self.speed * math.cos(self.direction)
-            self.y += self.speed * math.sin(self.direction)
+        # Normal target-seeking behavior
+        # Find closest fish if we don't have a target or our target was removed
+        target_pos = None
+        if hasattr(fish_list, 'nearest_id'):
+            # FishSwarm: track the target by entity ID (an O(1) liveness check)
+            # and find a new one through its spatial index
+            if (self.targeting == 'nearest' or self.target_id is None
+                    or not fish_list.is_alive(self.target_id)):
+                self.target_id = fish_list.nearest_id(self.x, self.y)
+            if self.target_id is not None:
+                target_pos = fish_list.position_of(self.target_id)
+        else:
+            if (self.targeting == 'nearest' or self.target_fish is None
+                    or self.target_fish not in fish_list):
+                closest_fish = None
+                min_distance = float('inf')
+                
+                for fish in fish_list:
+                    # Calculate distance to this fish
+                    dx = fish.x - self.x
+                    dy = fish.y - self.y
+                    distance = math.sqrt(dx * dx + dy * dy)
+                    
+                    if distance < min_distance:
+                        min_distance = distance
+                        closest_fish = fish
+                        
+                self.target_fish = closest_fish
+            if self.target_fish:
+                target_pos = (self.target_fish.x, self.target_fish.y)
+        
+        if target_pos:
+            self._swim_towards(target_pos)
+
+    def move_towards(self, target_pos):
+        """One AI step towards ``target_pos`` (a target picked elsewhere, e.g. by a SharkPack).
+
+        Collision recovery works as in ``move_towards_fish``; with no
+        target the shark stays put.
+        """
+        if self.collision_recovery > 0:
+            self._recover()
+        elif target_pos:
+            self._swim_towards(target_pos)
+
+    def _recover(self):
+        # Keep swimming in the direction taken after the collision
+        self.collision_recovery -= 1
+        
+        # Move based on current direction
+        self.x += self.speed * math.cos(self.direction)
+        self.y += self.speed * math.sin(self.direction)
+        
+        # Update rectangle position
+        self.rect.topleft = (self.x, self.y)
+        
+        # Update facing direction based on current movement
+        if math.cos(self.direction) < 0:  # Moving left
+            if self.facing_right:
+                self.image = self.flipped_image
+                self.facing_right = False
+        elif math.cos(self.direction) > 0:  # Moving right
+            if not self.facing_right:
+                self.image = self.original_image
+                self.facing_right = True
+                
+        # Store velocity components for collision handling
+        self.dx = self.speed * math.cos(self.direction)
+        self.dy = self.speed * math.sin(self.direction)
+
+    def _swim_towards(self, target_pos):
+        # Calculate direction to target fish
+        dx = target_pos[0] - self.x
+        dy = target_pos[1] - self.y
+        distance = math.sqrt(dx * dx + dy * dy)
+        
+        # Avoid division by zero
+        if distance > 0:
+            # Normalize direction vector
+            dx /= distance
+            dy /= distance
             
-            # Update rectangle position
-            self.rect.topleft = (self.x, self.y)
+            # Store the velocity components for collision handling
+            self.dx = dx * self.speed
+            self.dy = dy * self.speed
+            
+            # Update direction angle for collision handling
+            self.direction = math.atan2(dy, dx)
             
-            # Update facing direction based on current movement
-            if math.cos(self.direction) < 0:  # Moving left
+            # Check direction and flip image if needed
+            if dx < 0:  # Moving left
                 if self.facing_right:
                     self.image = self.flipped_image
                     self.facing_right = False
-            elif math.cos(self.direction) > 0:  # Moving right
+            elif dx > 0:  # Moving right
                 if not self.facing_right:
                     self.image = self.original_image
                     self.facing_right = True
-                    
-            # Store velocity components for collision handling
-            self.dx = self.speed * math.cos(self.direction)
-            self.dy = self.speed * math.sin(self.direction)
-            
-            return
             
-        # Normal target-seeking behavior
-        # Find closest fish if we don't have a target or our target was removed
-        if self.target_fish is None or self.target_fish not in fish_list:
-            closest_fish = None
-            min_distance = float('inf')
+            # Move towards target
+            self.x += self.dx
+            self.y += self.dy
             
-            for fish in fish_list:
-                # Calculate distance to this fish
-                dx = fish.x - self.x
-                dy = fish.y - self.y
-                distance = math.sqrt(dx * dx + dy * dy)
-                
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_fish = fish
-                    
-            self.target_fish = closest_fish
-        
-        if self.target_fish:
-            # Calculate direction to target fish
-            dx = self.target_fish.x - self.x
-            dy = self.target_fish.y - self.y
-            distance = math.sqrt(dx * dx + dy * dy)
-            
-            # Avoid division by zero
-            if distance > 0:
-                # Normalize direction vector
-                dx /= distance
-                dy /= distance
-                
-                # Store the velocity components for collision handling
-                self.dx = dx * self.speed
-                self.dy = dy * self.speed
-                
-                # Update direction angle for collision handling
-                self.direction = math.atan2(dy, dx)
-                
-                # Check direction and flip image if needed
-                if dx < 0:  # Moving left
-                    if self.facing_right:
-                        self.image = self.flipped_image
-                        self.facing_right = False
-                elif dx > 0:  # Moving right
-                    if not self.facing_right:
-                        self.image = self.original_image
-                        self.facing_right = True
-                
-                # Move towards target
-                self.x += self.dx
-                self.y += self.dy
-                
-                # Update rectangle position
-                self.rect.topleft = (self.x, self.y)
+            # Update rectangle position
+            self.rect.topleft = (self.x, self.y)
 
     def draw(self, screen):
         screen.blit(self.image, self.rect.topleft)
@@ -0,0 +1,161 @@
+import numpy as np
+
+from fish_swarm import FISH_SIZE
+
+
+class SharkPack:
+    """Many AI sharks hunting one FishSwarm, with targets assigned jointly.
+
+    Every tick ``assign_targets`` finds the fish near each shark with one
+    batched query on the swarm's SpatialGrid, widening the search only for
+    sharks with too few fish around, and keeps each shark's ``candidates``
+    nearest. Targets are then settled in auction rounds: every shark still
+    without a target bids for its nearest candidate nobody has taken yet,
+    and each fish goes to its closest bidder. Sharks left empty-handed
+    (more sharks than fish nearby) chase their nearest candidate anyway.
+    Sharks recovering from a cliff collision sit the assignment out.
+
+    The sharks themselves are ordinary Shark objects, so movement and cliff
+    recovery behave exactly as for a single shark. All sharks of a pack are
+    expected to share one image (and so one mask).
+    """
+
+    def __init__(self, sharks, candidates=8):
+        self.sharks = list(sharks)
+        self.candidates = candidates
+        # One shared mask list, so obstacle maps can cache their hit maps for it
+        first = self.sharks[0]
+        self.masks = [first.mask]
+        self.size = first.rect.size
+
+    def __len__(self):
+        return len(self.sharks)
+
+    def __iter__(self):
+        return iter(self.sharks)
+
+    def positions(self):
+        """Top-left corners of every shark as two float arrays."""
+        count = len(self.sharks)
+        xs = np.fromiter((shark.x for shark in self.sharks), dtype=np.float64, count=count)
+        ys = np.fromiter((shark.y for shark in self.sharks), dtype=np.float64, count=count)
+        return xs, ys
+
+    def centers(self):
+        xs, ys = self.positions()
+        return xs + self.size[0] / 2, ys + self.size[1] / 2
+
+    def _candidates(self, swarm, hunters, xs, ys):
+        """(shark, row, squared distance) of each hunter's nearest fish, sorted by shark then distance."""
+        grid = swarm.index
+        by_cell = grid.rows_by_cell()
+        k = min(self.candidates, swarm.count)
+        max_radius = max(grid.cols, grid.rows)
+        found = []
+        # Start from the square that holds k fish at the swarm's mean density
+        cells_needed = k * grid.cols * grid.rows / swarm.count
+        radius = min(max(1, int(np.ceil((np.sqrt(cells_needed) - 1) / 2))), max_radius)
+        while len(hunters):
+            points, rows = grid.pairs_near(xs[hunters], ys[hunters], radius, by_cell)
+            # Widen the search only for the sharks that found too few fish
+            done = np.bincount(points, minlength=len(hunters)) >= k
+            if radius >= max_radius:
+                done[:] = True
+            keep = done[points]
+            found.append((hunters[points[keep]], rows[keep]))
+            hunters = hunters[~done]
+            radius = min(radius * 2, max_radius)
+
+        shark = np.concatenate([f[0] for f in found])
+        row = np.concatenate([f[1] for f in found])
+        dx = swarm.x[row] - xs[shark]
+        dy = swarm.y[row] - ys[shark]
+        distance = dx * dx + dy * dy
+
+        # Keep each shark's k nearest. One argsort on a combined key is several
+        # times cheaper than lexsort; shark numbers and squared pixel distances
+        # are small enough for the key to stay exact in a float64.
+        order = np.argsort(shark * (distance.max() + 1) + distance)
+        shark, row, distance = shark[order], row[order], distance[order]
+        group_start = np.flatnonzero(np.r_[True, shark[1:] != shark[:-1]])
+        rank = np.arange(len(shark)) - np.repeat(group_start, np.diff(np.r_[group_start, len(shark)]))
+        nearest = rank < k
+        return shark[nearest], row[nearest], distance[nearest]
+
+    def assign_targets(self, swarm):
+        """Give every shark not recovering from a collision a target fish (``target_id``)."""
+        for shark in self.sharks:
+            shark.target_id = None
+        if swarm.count == 0:
+            return
+        xs, ys = self.positions()
+        hunters = np.flatnonzero([shark.collision_recovery == 0 for shark in self.sharks])
+        if len(hunters) == 0:
+            return
+        shark, row, distance = self._candidates(swarm, hunters, xs, ys)
+
+        # Auction rounds: free sharks bid for their nearest free fish, the closest bidder wins
+        target = np.full(len(self.sharks), -1, dtype=np.int64)
+        taken = np.zeros(swarm.count, dtype=bool)
+        for _ in range(self.candidates):
+            open_bids = np.flatnonzero((target[shark] < 0) & ~taken[row])
+            if len(open_bids) == 0:
+                break
+            # Pairs are sorted by shark then distance, so a shark's first open pair is its bid
+            bids = open_bids[np.r_[True, shark[open_bids[1:]] != shark[open_bids[:-1]]]]
+            bids = bids[np.lexsort((distance[bids], row[bids]))]
+            winners = bids[np.r_[True, row[bids[1:]] != row[bids[:-1]]]]
+            target[shark[winners]] = row[winners]
+            taken[row[winners]] = True
+
+        # Sharks that lost every auction chase their nearest fish anyway
+        first = np.r_[True, shark[1:] != shark[:-1]]
+        unassigned = first & (target[shark] < 0)
+        target[shark[unassigned]] = row[unassigned]
+
+        ids = swarm.ids
+        for index in np.flatnonzero(target >= 0).tolist():
+            self.sharks[index].target_id = int(ids[target[index]])
+
+    def move(self, swarm):
+        """Move every shark one step towards its target (or on with its collision recovery)."""
+        position_of = swarm.position_of
+        for shark in self.sharks:
+            target_pos = position_of(shark.target_id) if shark.target_id is not None else None
+            shark.move_towards(target_pos)
+
+    def hunt(self, swarm):
+        """Assign targets and move: one AI step for the whole pack."""
+        self.assign_targets(swarm)
+        self.move(swarm)
+
+    def hit_obstacles(self, obstacle_map):
+        """Sharks touching a static obstacle, found with one batched ObstacleMap query.
+
+        Sharks still recovering from a collision aren't checked, so they
+        aren't turned back towards the obstacle they are leaving.
+        """
+        sharks = [shark for shark in self.sharks if shark.collision_recovery == 0]
+        if not sharks:
+            return []
+        xs = np.fromiter((shark.rect.x for shark in sharks), dtype=np.int64, count=len(sharks))
+        ys = np.fromiter((shark.rect.y for shark in sharks), dtype=np.int64, count=len(sharks))
+        variants = np.zeros(len(sharks), dtype=np.int64)
+        hits = obstacle_map.hits(xs, ys, self.size[0], self.size[1], variants=variants, masks=self.masks)
+        return [sharks[index] for index in np.flatnonzero(hits >= 0).tolist()]
+
+    def eaten(self, swarm):
+        """Swarm rows of the fish any shark is touching."""
+        if swarm.count == 0:
+            return np.empty(0, dtype=np.int64)
+        xs = np.fromiter((shark.rect.x for shark in self.sharks), dtype=np.int64, count=len(self.sharks))
+        ys = np.fromiter((shark.rect.y for shark in self.sharks), dtype=np.int64, count=len(self.sharks))
+        # A fish touching a shark is filed at most this many cells away from the shark's corner
+        width, height = self.size
+        reach = -(-max(width, height, FISH_SIZE) // swarm.index.cell_size)
+        points, rows = swarm.index.pairs_near(xs, ys, reach)
+        left = swarm.x[rows].astype(np.int64)
+        top = swarm.y[rows].astype(np.int64)
+        touching = ((left < xs[points] + width) & (left + FISH_SIZE > xs[points]) &
+                    (top < ys[points] + height) & (top + FISH_SIZE > ys[points]))
+        return np.unique(rows[touching])
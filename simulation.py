@@ -0,0 +1,194 @@
+import pygame
+import random
+
+import numpy as np
+
+from fish_swarm import FishSwarm, FISH_SIZE
+from coverage_map import CoverageMap
+from spawn_sampler import SpawnSampler
+from obstacle_map import ObstacleMap
+from spatial_grid import SpatialGrid
+from collision_handler import CollisionHandler
+from shark import spawn_shark
+from shark_pack import SharkPack
+from schooling import Schooling
+from settings import SIM_DT, MAX_STEPS_PER_FRAME, MAX_FRAME_TIME
+from profiler import profiler
+
+
+class Simulation:
+    """The game world of one run: fish, sharks, cliff and score.
+
+    Holds no display or input state, so ``run_game`` can draw it and the
+    headless runner can step it as fast as possible. Every step advances a
+    fixed ``dt`` of simulated time, so behaviour doesn't depend on the frame
+    rate; ``advance`` feeds real elapsed time through an accumulator.
+    """
+
+    def __init__(self, fish_list, shark_image, screen_width, screen_height, cliff_rect,
+                 player_controlled=False, cliff_mask=None, shark_count=1, fish_behaviour='random_walk'):
+        self.fish_list = fish_list
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.cliff_rect = pygame.Rect(cliff_rect)
+        self.player_controlled = player_controlled
+
+        # Static obstacles: fish bounce off them, the shark recovers from them
+        self.obstacles = [self.cliff_rect]
+        self.obstacle_map = ObstacleMap(screen_width, screen_height, self.obstacles)
+        # Only the cliff's opaque pixels collide when its mask is given
+        self.obstacle_map.set_mask(0, cliff_mask)
+        self.collision_handler = CollisionHandler(self.obstacle_map)
+
+        # All fish live in one swarm, indexed for the shark's queries
+        self.fish = FishSwarm(atlas=fish_list)
+        self.fish.attach_index(SpatialGrid(screen_width, screen_height))
+        if fish_behaviour == 'schooling':
+            self.fish.behaviour = Schooling()
+        elif fish_behaviour != 'random_walk':
+            raise ValueError(f"Unknown fish behaviour: {fish_behaviour}")
+        self.fish_behaviour = fish_behaviour
+
+        # The first shark is the player's in player mode. With more than one,
+        # the AI sharks hunt as a pack with jointly assigned targets.
+        self.shark = spawn_shark(shark_image, screen_width, screen_height, player_controlled)
+        self.sharks = [self.shark] + [spawn_shark(shark_image, screen_width, screen_height)
+                                      for _ in range(shark_count - 1)]
+        hunters = self.sharks[1:] if player_controlled else self.sharks
+        self.pack = SharkPack(hunters) if shark_count > 1 and hunters else None
+
+        # Free water where new fish may appear; seeded from `random` so seeded runs repeat
+        self.spawn_sampler = SpawnSampler(screen_width, screen_height, self.obstacles,
+                                          rng=np.random.default_rng(random.getrandbits(64)))
+
+        # Where the fish and the sharks have been
+        self.coverage = CoverageMap(screen_width, screen_height)
+
+        self.score = 0
+        self.ticks = 0
+        self.dt = SIM_DT
+        self.time = 0.0  # Simulated seconds since the game started
+        self.accumulator = 0.0  # Real time not yet consumed by steps
+        self.cliff_collisions = 0
+        self.shark_hit_cliff = False  # Whether a shark hit the cliff on the last step
+        self.profiler = profiler  # Phase timings (no-op unless enabled)
+
+    def add_obstacle(self, rect, mask=None):
+        """Add a static obstacle; fish spawned from now on won't be placed on it."""
+        rect = pygame.Rect(rect)
+        self.obstacles.append(rect)
+        self.obstacle_map.add(rect, mask)
+        self.spawn_sampler.add_obstacle(rect)
+
+    def plan_fish(self):
+        """Pick a variant and a free position for a new fish: ``(variant, x, y)``.
+
+        Touches no world state, so it is safe to call from another thread.
+        """
+        x, y = self.spawn_sampler.sample_one()
+        return random.randrange(len(self.fish_list)), x, y
+
+    def plan_fish_batch(self, count):
+        """``plan_fish`` for ``count`` fish at once, placed with one vectorized sample."""
+        xs, ys = self.spawn_sampler.sample(count)
+        variants = self.spawn_sampler.rng.integers(len(self.fish_list), size=count)
+        return list(zip(variants.tolist(), xs.tolist(), ys.tolist()))
+
+    def spawn_fish(self, spawn=None):
+        """Add a fish (planned with ``plan_fish`` if not given) and return its ID."""
+        variant, x, y = spawn if spawn is not None else self.plan_fish()
+        # Direction-change timers run on simulated time from the moment of arrival
+        return self.fish.spawn(variant, x, y, now=self.time)
+
+    def spawn_fish_batch(self, count):
+        """Add ``count`` fish at uniformly random free positions; returns their IDs."""
+        xs, ys = self.spawn_sampler.sample(count)
+        variants = self.spawn_sampler.rng.integers(len(self.fish_list), size=count)
+        return self.fish.spawn_batch(variants, xs, ys, now=self.time)
+
+    def step(self, keys=None):
+        """Advance the world by one tick. Returns the IDs of the fish eaten during it."""
+        shark = self.shark
+        profiler = self.profiler
+
+        # Update shark positions based on game mode
+        pack = self.pack
+        if self.player_controlled:
+            shark.handle_player_control(keys)
+            shark.keep_in_bounds(self.screen_width, self.screen_height)
+        elif pack is None:
+            shark.move_towards_fish(self.fish)
+        if pack is not None:
+            pack.hunt(self.fish)
+
+        # Check for collisions between sharks and the cliff (or any other obstacle).
+        # An AI shark already turned away keeps recovering without being turned
+        # back again; the player's shark is always stopped.
+        hit = []
+        if (pack is None or self.player_controlled) and (self.player_controlled or shark.collision_recovery == 0):
+            if self.collision_handler.check_obstacles(shark) >= 0:
+                hit.append(shark)
+        if pack is not None:
+            hit.extend(pack.hit_obstacles(self.obstacle_map))
+        for hit_shark in hit:
+            hit_shark.handle_cliff_collision()
+        self.shark_hit_cliff = bool(hit)
+        self.cliff_collisions += len(hit)
+        profiler.mark('shark_ai')
+
+        # Where the sharks are, for schooling fish to flee and for the coverage map
+        if pack is None:
+            shark_xs = np.array([shark.rect.centerx], dtype=np.float64)
+            shark_ys = np.array([shark.rect.centery], dtype=np.float64)
+        else:
+            shark_xs, shark_ys = pack.centers()
+            if self.player_controlled:
+                shark_xs = np.append(shark_xs, shark.rect.centerx)
+                shark_ys = np.append(shark_ys, shark.rect.centery)
+
+        # Move the whole swarm
+        self.fish.update(self.screen_width, self.screen_height, now=self.time,
+                         threats=(shark_xs, shark_ys))
+        profiler.mark('fish_move')
+
+        # Bounce every fish that swam into an obstacle; fish a shark is touching are eaten
+        self.collision_handler.handle_swarm_collisions(self.fish)
+        if pack is None:
+            eaten_rows = self.fish.overlapping(shark.rect)
+        else:
+            eaten_rows = pack.eaten(self.fish)
+            if self.player_controlled:
+                eaten_rows = np.union1d(eaten_rows, self.fish.overlapping(shark.rect))
+        eaten = self.fish.remove(eaten_rows)
+        self.score += len(eaten)
+        profiler.mark('collisions')
+
+        # Record the cells under the centres of every fish and shark
+        fish = self.fish
+        half = FISH_SIZE / 2
+        self.coverage.update(np.append(fish.x[:fish.count] + half, shark_xs),
+                             np.append(fish.y[:fish.count] + half, shark_ys))
+        profiler.mark('coverage')
+
+        self.ticks += 1
+        self.time += self.dt
+        return eaten
+
+    def advance(self, elapsed, keys=None):
+        """Run as many fixed steps as ``elapsed`` real seconds allow.
+
+        Leftover time carries over to the next call. At most
+        MAX_STEPS_PER_FRAME steps run per call; if the simulation still
+        lags behind after that, the backlog is dropped rather than letting
+        it grow. Returns the IDs of the fish eaten during all the steps.
+        """
+        self.accumulator += min(elapsed, MAX_FRAME_TIME)
+        eaten = []
+        steps = 0
+        while self.accumulator >= self.dt and steps < MAX_STEPS_PER_FRAME:
+            eaten.extend(self.step(keys))
+            self.accumulator -= self.dt
+            steps += 1
+        if self.accumulator >= self.dt:
+            self.accumulator = 0.0
+        return eaten
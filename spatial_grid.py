@@ -0,0 +1,196 @@
+import numpy as np
+
+from fish_swarm import FISH_SIZE
+from grid_cells import grid_shape, cells_of, sort_by_cell, expand_runs
+
+
+class SpatialGrid:
+    """Uniform-grid spatial index over the rows of a FishSwarm.
+
+    Every fish is filed under the cell that contains its top-left corner.
+    The swarm keeps the grid up to date as fish spawn, move and get eaten;
+    after each movement step only the fish that crossed into a new cell
+    touch the buckets, so maintenance stays cheap.
+    """
+
+    def __init__(self, width, height, cell_size=64):
+        self.cell_size = cell_size
+        self.cols, self.rows = grid_shape(width, height, cell_size)
+        self.buckets = [set() for _ in range(self.cols * self.rows)]
+
+        # Cell currently holding each swarm row (-1 if the row isn't filed)
+        self.cell_of_row = np.full(64, -1, dtype=np.int64)
+        self.swarm = None
+
+    def bind(self, swarm):
+        """Index every fish already in ``swarm``; called by FishSwarm.attach_index."""
+        self.swarm = swarm
+        for bucket in self.buckets:
+            bucket.clear()
+        self.cell_of_row[:] = -1
+        for row in range(swarm.count):
+            self.insert(row)
+
+    def _cells_for(self, x, y):
+        """Vectorized cell index for arrays of pixel positions."""
+        return cells_of(x, y, self.cell_size, self.cols, self.rows)
+
+    def _cell_for(self, x, y):
+        cx = min(max(int(x // self.cell_size), 0), self.cols - 1)
+        cy = min(max(int(y // self.cell_size), 0), self.rows - 1)
+        return cy * self.cols + cx
+
+    def insert(self, row):
+        if row >= len(self.cell_of_row):
+            grown = np.full(max(row + 1, len(self.cell_of_row) * 2), -1, dtype=np.int64)
+            grown[:len(self.cell_of_row)] = self.cell_of_row
+            self.cell_of_row = grown
+        cell = self._cell_for(self.swarm.x[row], self.swarm.y[row])
+        self.cell_of_row[row] = cell
+        self.buckets[cell].add(row)
+
+    def remove(self, row):
+        cell = self.cell_of_row[row]
+        if cell >= 0:
+            self.buckets[cell].discard(row)
+            self.cell_of_row[row] = -1
+
+    def relocate(self, src, dst):
+        """Re-file the fish stored at row ``src`` under its new row ``dst``."""
+        cell = self.cell_of_row[src]
+        self.buckets[cell].discard(src)
+        self.buckets[cell].add(dst)
+        self.cell_of_row[dst] = cell
+        self.cell_of_row[src] = -1
+
+    def sync(self, rows=None):
+        """Move fish whose position now falls in a different cell.
+
+        ``rows`` limits the check to the given swarm rows (all rows by default).
+        """
+        n = self.swarm.count
+        if n == 0:
+            return
+        if rows is None:
+            rows = np.arange(n)
+            new_cells = self._cells_for(self.swarm.x[:n], self.swarm.y[:n])
+        else:
+            new_cells = self._cells_for(self.swarm.x[rows], self.swarm.y[rows])
+        old_cells = self.cell_of_row[rows]
+        moved = np.flatnonzero(new_cells != old_cells)
+        if len(moved) == 0:
+            return
+        changed = rows[moved]
+        buckets = self.buckets
+        for row, old, new in zip(changed.tolist(), old_cells[moved].tolist(),
+                                 new_cells[moved].tolist()):
+            buckets[old].discard(row)
+            buckets[new].add(row)
+        self.cell_of_row[changed] = new_cells[moved]
+
+    def _rows_in_cells(self, col_min, col_max, row_min, row_max):
+        col_min = max(col_min, 0)
+        row_min = max(row_min, 0)
+        col_max = min(col_max, self.cols - 1)
+        row_max = min(row_max, self.rows - 1)
+        found = []
+        for cy in range(row_min, row_max + 1):
+            base = cy * self.cols
+            for cx in range(col_min, col_max + 1):
+                found.extend(self.buckets[base + cx])
+        return found
+
+    def query_rect(self, rect):
+        """Return the swarm rows whose fish rect overlaps ``rect``."""
+        size = self.cell_size
+        # A fish filed in a cell up or left of the rect can still reach into it
+        candidates = self._rows_in_cells(
+            (rect.left - FISH_SIZE) // size, (rect.right - 1) // size,
+            (rect.top - FISH_SIZE) // size, (rect.bottom - 1) // size,
+        )
+        if not candidates:
+            return np.empty(0, dtype=np.int64)
+        rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        left = self.swarm.x[rows].astype(np.int64)
+        top = self.swarm.y[rows].astype(np.int64)
+        mask = ((left < rect.right) & (left + FISH_SIZE > rect.left) &
+                (top < rect.bottom) & (top + FISH_SIZE > rect.top))
+        return np.sort(rows[mask])
+
+    def rows_by_cell(self):
+        """Swarm rows sorted by cell, and where each cell's rows start (plus one end offset)."""
+        return sort_by_cell(self.cell_of_row[:self.swarm.count], self.cols * self.rows)
+
+    def pairs_near(self, xs, ys, radius=1, by_cell=None):
+        """Batched neighbourhood query for many points at once.
+
+        Returns index arrays ``(points, rows)`` with one entry for every fish
+        filed within ``radius`` cells (in both directions) of the cell of
+        point ``(xs[i], ys[i])``. Each row of cells in a neighbourhood is a
+        contiguous run of the cell-sorted rows, so all points are served by
+        a few vectorized steps, with no loop over points or cells.
+        ``by_cell`` may pass on a ``rows_by_cell`` result for several
+        queries between moves.
+        """
+        order, start = by_cell if by_cell is not None else self.rows_by_cell()
+        cells = self._cells_for(np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64))
+        cx, cy = cells % self.cols, cells // self.cols
+        x0 = np.maximum(cx - radius, 0)
+        x1 = np.minimum(cx + radius, self.cols - 1)
+
+        # One (point, row of cells) entry per row of cells in each neighbourhood
+        dys = np.arange(-radius, radius + 1)
+        point = np.repeat(np.arange(len(cells)), len(dys))
+        cell_row = cy[point] + np.tile(dys, len(cells))
+        inside = (cell_row >= 0) & (cell_row < self.rows)
+        point, cell_row = point[inside], cell_row[inside]
+
+        # Expand each entry into its contiguous run of cell-sorted rows
+        base = cell_row * self.cols
+        first = start[base + x0[point]]
+        counts = start[base + x1[point] + 1] - first
+        return np.repeat(point, counts), order[expand_runs(first, counts)]
+
+    def nearest(self, x, y):
+        """Return the swarm row of the fish nearest to (x, y), or None if empty.
+
+        Searches rings of cells outwards from the point and stops once no
+        unvisited cell could hold anything closer than the best match.
+        """
+        if self.swarm is None or self.swarm.count == 0:
+            return None
+        size = self.cell_size
+        cx = min(max(int(x // size), 0), self.cols - 1)
+        cy = min(max(int(y // size), 0), self.rows - 1)
+        best_row = None
+        best_dist_sq = float('inf')
+        max_ring = max(self.cols, self.rows)
+
+        for ring in range(max_ring + 1):
+            candidates = []
+            if ring == 0:
+                candidates = list(self.buckets[cy * self.cols + cx])
+            else:
+                # Top and bottom edges of the ring, then the left and right sides
+                for ry in (cy - ring, cy + ring):
+                    candidates.extend(self._rows_in_cells(cx - ring, cx + ring, ry, ry))
+                for rx in (cx - ring, cx + ring):
+                    candidates.extend(self._rows_in_cells(rx, rx, cy - ring + 1, cy + ring - 1))
+
+            if candidates:
+                rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+                dx = self.swarm.x[rows] - x
+                dy = self.swarm.y[rows] - y
+                dist_sq = dx * dx + dy * dy
+                i = int(np.argmin(dist_sq))
+                if dist_sq[i] < best_dist_sq:
+                    best_dist_sq = float(dist_sq[i])
+                    best_row = int(rows[i])
+
+            # Anything outside the rings searched so far is at least `reach` away
+            reach = min(x - (cx - ring) * size, (cx + ring + 1) * size - x,
+                        y - (cy - ring) * size, (cy + ring + 1) * size - y)
+            if best_row is not None and reach > 0 and best_dist_sq <= reach * reach:
+                break
+
+        return best_row
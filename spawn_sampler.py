@@ -0,0 +1,106 @@
+import random
+import threading
+
+import numpy as np
+
+from fish_swarm import FISH_SIZE
+
+
+class SpawnSampler:
+    """Exact uniform sampling of the positions where a fish fits in free water.
+
+    A fish's top-left corner can be any integer point that keeps its
+    ``size`` x ``size`` rect on screen and off every obstacle. Each obstacle
+    rules out a rectangle of corners, so the free corners are cut, along the
+    obstacle edges, into disjoint strips. The strips are built once (and
+    rebuilt lazily after ``add_obstacle``); sampling then draws uniform
+    indices over all free corners and maps them onto the strips, with no
+    rejection and no retries.
+    """
+
+    def __init__(self, width, height, obstacles=(), size=FISH_SIZE, rng=None):
+        self.width = width
+        self.height = height
+        self.size = size
+        self.obstacles = [tuple(rect) for rect in obstacles]
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.free_positions = 0  # Number of valid corners (after _build)
+        self._strips = None  # Free strips (x, y, width, first index, end index), built on demand
+        self._lock = threading.Lock()  # The planner thread and the game loop may both sample
+
+    def add_obstacle(self, rect):
+        with self._lock:
+            self.obstacles.append(tuple(rect))
+            self._strips = None
+
+    def set_obstacles(self, rects):
+        with self._lock:
+            self.obstacles = [tuple(rect) for rect in rects]
+            self._strips = None
+
+    def _build(self):
+        # Valid corners are [0, max_x) x [0, max_y)
+        size = self.size
+        max_x = max(self.width - size + 1, 0)
+        max_y = max(self.height - size + 1, 0)
+
+        # An obstacle rules out corners in [ox - size + 1, ox + ow) x [oy - size + 1, oy + oh)
+        blocked = []
+        for ox, oy, ow, oh in self.obstacles:
+            if ow <= 0 or oh <= 0:
+                continue  # Empty rects collide with nothing
+            x0, x1 = max(ox - size + 1, 0), min(ox + ow, max_x)
+            y0, y1 = max(oy - size + 1, 0), min(oy + oh, max_y)
+            if x0 < x1 and y0 < y1:
+                blocked.append((x0, x1, y0, y1))
+
+        # Cut the corner space along every blocked edge; each cell is then all free or all blocked
+        xs = np.unique(np.array([0, max_x] + [b[0] for b in blocked] + [b[1] for b in blocked]))
+        ys = np.unique(np.array([0, max_y] + [b[2] for b in blocked] + [b[3] for b in blocked]))
+        grid = np.zeros((max(len(ys) - 1, 0), max(len(xs) - 1, 0)), dtype=bool)
+        for x0, x1, y0, y1 in blocked:
+            i0, i1 = np.searchsorted(xs, (x0, x1))
+            j0, j1 = np.searchsorted(ys, (y0, y1))
+            grid[j0:j1, i0:i1] = True
+
+        # Merge each row's runs of free cells into strips
+        free = np.zeros((grid.shape[0], grid.shape[1] + 2), dtype=np.int8)
+        free[:, 1:-1] = ~grid
+        edges = np.diff(free, axis=1)
+        rows, starts = np.nonzero(edges == 1)
+        _, ends = np.nonzero(edges == -1)
+        strip_x = xs[starts]
+        strip_width = xs[ends] - strip_x
+        strip_y = ys[rows]
+        strip_height = ys[rows + 1] - strip_y
+
+        counts = strip_width * strip_height
+        cumulative = np.cumsum(counts)
+        self.free_positions = int(cumulative[-1]) if len(cumulative) else 0
+        self._strips = (strip_x, strip_y, strip_width, cumulative - counts, cumulative)
+
+    def _locate(self, index):
+        """Map indices over all free corners onto (x, y) corners."""
+        strip_x, strip_y, strip_width, first, cumulative = self._strips
+        strip = np.searchsorted(cumulative, index, side='right')
+        offset = index - first[strip]
+        return strip_x[strip] + offset % strip_width[strip], strip_y[strip] + offset // strip_width[strip]
+
+    def sample(self, count):
+        """Return arrays ``(xs, ys)`` of ``count`` independent uniform free corners."""
+        with self._lock:
+            if self._strips is None:
+                self._build()
+            if self.free_positions == 0:
+                raise ValueError("No free space left to place a fish")
+            return self._locate(self.rng.integers(self.free_positions, size=count))
+
+    def sample_one(self, rand=random):
+        """One uniform free corner ``(x, y)`` drawn with a ``random.Random``-like source."""
+        with self._lock:
+            if self._strips is None:
+                self._build()
+            if self.free_positions == 0:
+                raise ValueError("No free space left to place a fish")
+            x, y = self._locate(rand.randrange(self.free_positions))
+        return int(x), int(y)
@@ -0,0 +1,112 @@
+import threading
+from collections import deque
+
+from event_log import events
+from settings import SPAWN_RATE, SPAWN_BURST, SPAWN_CAP
+
+
+class SpawnScheduler:
+    """Decides when fish arrive and plans where, ahead of time.
+
+    Fish arrive at ``rate`` per simulated second, ``burst`` at a time, while
+    fewer than ``cap`` fish are alive (None for no cap); arrivals held back
+    by the cap are deferred, not dropped. A planner thread fills batches of
+    ``batch_size`` placements with ``plan(count)`` (e.g.
+    ``Simulation.plan_fish_batch``) and hands each finished batch over by
+    appending it to a deque, so the game loop takes a whole batch with one
+    atomic ``popleft`` and never waits on a lock. If the planner falls
+    behind, the missing placements are planned inline instead; with
+    ``threaded=False`` every placement is. ``close`` stops and joins the
+    planner; use the scheduler as a context manager so that happens on
+    every exit path.
+    """
+
+    def __init__(self, plan, rate=SPAWN_RATE, burst=SPAWN_BURST, cap=SPAWN_CAP,
+                 batch_size=16, threaded=True):
+        self.plan = plan
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.cap = cap
+        self.batch_size = max(batch_size, self.burst)
+        self.threaded = threaded
+
+        self.spawned = 0  # Fish handed out so far
+        self.planned_inline = 0  # Placements the game loop had to plan itself
+
+        self._credit = 0.0  # Arrivals earned but not yet released
+        self._last_time = None
+        self._ready = deque()  # Finished batches from the planner thread
+        self._planned = []  # Placements taken from _ready, not yet handed out
+        self._stop_event = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        if self.threaded and self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run_planner, name="SpawnPlanner", daemon=True)
+            self._thread.start()
+            events.info("spawn_planner_started", rate=self.rate, burst=self.burst, cap=self.cap)
+
+    def _run_planner(self):
+        while not self._stop_event.is_set():
+            # Keep two batches in hand, then sleep until the game loop takes one
+            if len(self._ready) >= 2:
+                self._wake.wait(0.5)
+                self._wake.clear()
+                continue
+            try:
+                self._ready.append(self.plan(self.batch_size))
+            except Exception as e:
+                events.error("spawn_planner_error", error=repr(e))
+                self._stop_event.wait(1)  # Don't spin on a persistent error
+
+    def close(self):
+        """Stop the planner thread and wait for it to exit."""
+        if self._thread is not None:
+            self._stop_event.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+            events.info("spawn_planner_stopped", spawned=self.spawned, planned_inline=self.planned_inline)
+
+    def take(self, now, alive):
+        """Return the placements due by simulated time ``now`` with ``alive`` fish in the sea."""
+        if self._last_time is None:
+            self._last_time = now
+        self._credit += (now - self._last_time) * self.rate
+        self._last_time = now
+
+        due = int(self._credit // self.burst) * self.burst
+        if self.cap is not None:
+            room = max(self.cap - alive, 0)
+            if due > room:
+                due = room
+                # Hold back at most one burst while capped instead of saving up a flood
+                self._credit = min(self._credit, due + self.burst)
+        if due <= 0:
+            return []
+        self._credit -= due
+        self.spawned += due
+        return self._pop(due)
+
+    def _pop(self, count):
+        planned = self._planned
+        while len(planned) < count:
+            try:
+                planned.extend(self._ready.popleft())
+            except IndexError:
+                missing = count - len(planned)
+                planned.extend(self.plan(missing))
+                self.planned_inline += missing
+        self._wake.set()
+        spawns = planned[:count]
+        del planned[:count]
+        return spawns
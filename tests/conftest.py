@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session")
+def headless():
+    """Initialize pygame headlessly with the game assets (loaded from the repo root)."""
+    import pygame
+    from headless import init_headless
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    init_headless()
+    yield
+    pygame.quit()
+    os.chdir(cwd)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from fish import Fish
+from fish_swarm import FishSwarm, RIGHT
+
+
+def test_move_leaves_the_direction_schedule_alone():
+    swarm = FishSwarm(rng=np.random.default_rng(1))
+    fish_id = swarm.spawn(0, 100.0, 100.0, direction=RIGHT, now=0.0)
+    fish = Fish.view(swarm, fish_id)
+    for _ in range(100):
+        fish.move(800, 600)
+    assert fish.x == 300.0
+    assert fish.direction_code == RIGHT
+    assert fish.last_direction_change_time == 0.0
+
+
+def test_direction_changes_run_on_simulated_time():
+    swarm = FishSwarm(rng=np.random.default_rng(1))
+    fish_id = swarm.spawn(0, 300.0, 300.0, interval=0.5, now=0.0)
+    fish = Fish.view(swarm, fish_id)
+    ticks = int(round(0.5 / swarm.dt))
+    for _ in range(ticks):
+        swarm.update(800, 600)
+    assert fish.last_direction_change_time == ticks * swarm.dt
+
+
+def test_empty_swarm_drops_due_directions():
+    swarm = FishSwarm(rng=np.random.default_rng(1))
+    fish_id = swarm.spawn(0, 300.0, 300.0, interval=0.5, now=0.0)
+    swarm.remove_id(fish_id)
+    for _ in range(int(round(0.5 / swarm.dt))):
+        swarm.update(800, 600)
+    assert not swarm._schedule and not swarm._spawned
+
+
+def test_removed_fish_handle_raises():
+    swarm = FishSwarm(rng=np.random.default_rng(1))
+    fish_id = swarm.spawn(0, 100.0, 100.0)
+    other = Fish.view(swarm, swarm.spawn(1, 200.0, 200.0))
+    fish = Fish.view(swarm, fish_id)
+    swarm.remove_id(fish_id)
+    assert fish not in swarm
+    with pytest.raises(LookupError):
+        fish.x
+    with pytest.raises(LookupError):
+        fish.y = 5.0
+    with pytest.raises(LookupError):
+        fish.move(800, 600)
+    # The fish swapped into the freed row is untouched
+    assert (other.x, other.y) == (200.0, 200.0)
+
+
+def test_create_fish_follows_random_seed(headless):
+    import random
+    import pygame
+    from asset_manager import assets
+    from fish import create_fish
+    from settings import CLIFF_RECT
+    fish_list = assets.get('fish_tiles')
+    cliff = pygame.Rect(CLIFF_RECT)
+    runs = []
+    for _ in range(2):
+        random.seed(7)
+        fish = [create_fish(fish_list, 800, 600, cliff) for _ in range(5)]
+        runs.append([(f.variant, f.x, f.y, f.direction_code) for f in fish])
+    assert runs[0] == runs[1]
@@ -0,0 +1,22 @@
+import pytest
+
+from headless import run_headless
+
+# Summary entries that measure the machine rather than the game
+TIMINGS = ('wall_time', 'ticks_per_sec', 'phases')
+
+
+def _game(summary):
+    return {name: value for name, value in summary.items() if name not in TIMINGS}
+
+
+@pytest.mark.parametrize("mode, shark_count, fish_behaviour", [
+    ("auto", 1, "random_walk"),
+    ("player", 1, "random_walk"),
+    ("auto", 3, "schooling"),
+])
+def test_seeded_runs_repeat(headless, mode, shark_count, fish_behaviour):
+    runs = [run_headless(mode, 600, initial_fish=30, seed=7, shark_count=shark_count,
+                         fish_behaviour=fish_behaviour)
+            for _ in range(2)]
+    assert _game(runs[0]) == _game(runs[1])
@@ -0,0 +1,30 @@
+import pytest
+
+import headless as headless_module
+from headless import run_headless
+
+TICKS = 2000
+
+
+@pytest.mark.parametrize("mode", ["auto", "player"])
+@pytest.mark.parametrize("seed", [1, 2, 3, 4])
+def test_pack_sharks_recover_from_the_cliff(headless, mode, seed):
+    # A shark locked against the cliff collides almost every tick; one that
+    # recovers can hit it at most once per recovery period
+    summary = run_headless(mode, TICKS, seed=seed, shark_count=4, script="idle:1",
+                           fish_behaviour="random_walk")
+    recovering_sharks = 4 if mode == "auto" else 3
+    assert summary['cliff_collisions'] <= recovering_sharks * TICKS / 60
+
+
+def test_shark_config_applies_to_every_shark(headless, monkeypatch):
+    sims = []
+
+    class RecordedSimulation(headless_module.Simulation):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            sims.append(self)
+
+    monkeypatch.setattr(headless_module, "Simulation", RecordedSimulation)
+    run_headless("auto", 10, seed=1, shark_count=3, shark_config={'speed': 5, 'targeting': 'nearest'})
+    assert [(shark.speed, shark.targeting) for shark in sims[0].sharks] == [(5, 'nearest')] * 3
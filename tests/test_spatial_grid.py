@@ -0,0 +1,48 @@
+import numpy as np
+import pygame
+
+from fish_swarm import FishSwarm, FISH_SIZE
+from spatial_grid import SpatialGrid
+
+WIDTH, HEIGHT = 400, 300
+
+
+def build_swarm(rng, count):
+    swarm = FishSwarm(rng=rng)
+    swarm.attach_index(SpatialGrid(WIDTH, HEIGHT, cell_size=32))
+    ids = [swarm.spawn(0, float(rng.uniform(0, WIDTH - FISH_SIZE)), float(rng.uniform(0, HEIGHT - FISH_SIZE)))
+           for _ in range(count)]
+    return swarm, ids
+
+
+def test_queries_match_brute_force_with_removals():
+    rng = np.random.default_rng(0)
+    swarm, ids = build_swarm(rng, 300)
+    grid = swarm.index
+    for _ in range(20):
+        # Eat a few fish and let the rest swim on
+        for fish_id in rng.choice(ids, size=10, replace=False).tolist():
+            swarm.remove_id(fish_id)
+        ids = swarm.ids[:swarm.count].tolist()
+        swarm.update(WIDTH, HEIGHT)
+        x, y = swarm.x[:swarm.count], swarm.y[:swarm.count]
+
+        for _ in range(10):
+            px, py = rng.uniform(-20, WIDTH + 20), rng.uniform(-20, HEIGHT + 20)
+            row = grid.nearest(px, py)
+            distance = (x - px) ** 2 + (y - py) ** 2
+            assert distance[row] == distance.min()
+
+            rect = pygame.Rect(int(rng.integers(-20, WIDTH)), int(rng.integers(-20, HEIGHT)),
+                               int(rng.integers(1, 120)), int(rng.integers(1, 120)))
+            left, top = x.astype(np.int64), y.astype(np.int64)
+            expected = np.flatnonzero((left < rect.right) & (left + FISH_SIZE > rect.left) &
+                                      (top < rect.bottom) & (top + FISH_SIZE > rect.top))
+            assert grid.query_rect(rect).tolist() == expected.tolist()
+
+
+def test_nearest_of_empty_swarm_is_none():
+    swarm, ids = build_swarm(np.random.default_rng(1), 3)
+    for fish_id in ids:
+        swarm.remove_id(fish_id)
+    assert swarm.index.nearest(10.0, 10.0) is None
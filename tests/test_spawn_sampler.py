@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from spawn_sampler import SpawnSampler
+
+WIDTH, HEIGHT, SIZE = 60, 45, 8
+
+
+def free_corners(obstacles):
+    """Brute force: every corner whose fish rect stays on screen and off the obstacles."""
+    free = np.ones((HEIGHT - SIZE + 1, WIDTH - SIZE + 1), dtype=bool)
+    for ox, oy, ow, oh in obstacles:
+        if ow <= 0 or oh <= 0:
+            continue
+        free[max(oy - SIZE + 1, 0):max(oy + oh, 0), max(ox - SIZE + 1, 0):max(ox + ow, 0)] = False
+    return free
+
+
+def random_obstacles(rng):
+    return [tuple(int(v) for v in (rng.integers(-10, WIDTH), rng.integers(-10, HEIGHT),
+                                   rng.integers(0, 25), rng.integers(0, 25)))
+            for _ in range(int(rng.integers(0, 8)))]
+
+
+def test_samples_match_brute_force():
+    rng = np.random.default_rng(0)
+    for seed in range(100):
+        obstacles = random_obstacles(rng)
+        free = free_corners(obstacles)
+        sampler = SpawnSampler(WIDTH, HEIGHT, obstacles, size=SIZE, rng=np.random.default_rng(seed))
+        if not free.any():
+            with pytest.raises(ValueError):
+                sampler.sample(1)
+            continue
+        xs, ys = sampler.sample(200)
+        assert sampler.free_positions == int(free.sum())
+        assert free[ys, xs].all()
+        x, y = sampler.sample_one()
+        assert free[y, x]
+
+
+def test_no_free_space_raises():
+    sampler = SpawnSampler(WIDTH, HEIGHT, [(0, 0, WIDTH, HEIGHT)], size=SIZE)
+    with pytest.raises(ValueError):
+        sampler.sample(1)
+    with pytest.raises(ValueError):
+        sampler.sample_one()
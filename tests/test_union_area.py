@@ -0,0 +1,40 @@
+import numpy as np
+
+from union_area import union_area
+
+
+def bitmap_area(rects, bounds=None, offset=20, size=100):
+    """Brute force: paint every rect into a pixel bitmap and count the pixels."""
+    covered = np.zeros((size, size), dtype=bool)
+    for x, y, width, height in rects:
+        covered[max(y + offset, 0):max(y + height + offset, 0),
+                max(x + offset, 0):max(x + width + offset, 0)] = True
+    if bounds is not None:
+        x, y, width, height = bounds
+        inside = np.zeros_like(covered)
+        inside[max(y + offset, 0):max(y + height + offset, 0),
+               max(x + offset, 0):max(x + width + offset, 0)] = True
+        covered &= inside
+    return int(covered.sum())
+
+
+def random_rects(rng, count):
+    # Some rects start off screen, and some are empty
+    return [tuple(int(v) for v in (rng.integers(-15, 50), rng.integers(-15, 50),
+                                   rng.integers(0, 30), rng.integers(0, 30)))
+            for _ in range(count)]
+
+
+def test_union_area_matches_bitmap():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        rects = random_rects(rng, int(rng.integers(0, 12)))
+        assert union_area(rects) == bitmap_area(rects)
+
+
+def test_union_area_clips_to_bounds():
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        rects = random_rects(rng, int(rng.integers(0, 12)))
+        bounds = random_rects(rng, 1)[0]
+        assert union_area(rects, bounds) == bitmap_area(rects, bounds)
@@ -1,12 +1,64 @@
 import pygame
+from collections import OrderedDict
 
-def draw_text(screen, text, size, x, y, color=(255, 255, 255)):
+FONT_PATH = 'assets/pixel_font.otf'
+
+# Loaded fonts keyed by (path, size); a path of None is pygame's default font
+_font_cache = {}
+
+# Rendered text surfaces keyed by (font, text, color, antialias), least recently used first
+_text_cache = OrderedDict()
+TEXT_CACHE_SIZE = 256
+
+# Hit/miss counters for both caches (see get_cache_stats)
+_cache_stats = {'font_hits': 0, 'font_misses': 0, 'text_hits': 0, 'text_misses': 0}
+
+def get_font(size, path=FONT_PATH):
+    """Return a shared Font for (path, size), loading it from disk only once."""
+    key = (path, size)
+    font = _font_cache.get(key)
+    if font is not None:
+        _cache_stats['font_hits'] += 1
+        return font
+    _cache_stats['font_misses'] += 1
     try:
-        font = pygame.font.Font('assets/pixel_font.otf', size)
-    except pygame.error:
+        font = pygame.font.Font(path, size)
+    except (pygame.error, FileNotFoundError):
         # Fallback to default font if custom font not found
         font = pygame.font.Font(None, size)
-    text_surface = font.render(text, True, color)
+    _font_cache[key] = font
+    return font
+
+def render_text(font, text, color, antialias=True):
+    """Render text through an LRU cache. The returned surface is shared; don't draw on it."""
+    key = (font, text, tuple(color), antialias)
+    surface = _text_cache.get(key)
+    if surface is not None:
+        _cache_stats['text_hits'] += 1
+        _text_cache.move_to_end(key)
+        return surface
+    _cache_stats['text_misses'] += 1
+    surface = font.render(text, antialias, color)
+    _text_cache[key] = surface
+    if len(_text_cache) > TEXT_CACHE_SIZE:
+        _text_cache.popitem(last=False)
+    return surface
+
+def get_cache_stats():
+    """Return the font/text cache counters and current sizes."""
+    stats = dict(_cache_stats)
+    stats['fonts_cached'] = len(_font_cache)
+    stats['texts_cached'] = len(_text_cache)
+    return stats
+
+def clear_caches():
+    """Drop all cached fonts and text (e.g. after pygame.font is re-initialized)."""
+    _font_cache.clear()
+    _text_cache.clear()
+
+def draw_text(screen, text, size, x, y, color=(255, 255, 255)):
+    font = get_font(size)
+    text_surface = render_text(font, text, color)
     text_rect = text_surface.get_rect()
     text_rect.center = (x, y)
     screen.blit(text_surface, text_rect)
@@ -26,13 +78,9 @@ def draw_button(screen, text, size, x, y, width, height, inactive_color, active_
         pygame.draw.rect(screen, inactive_color, (x, y, width, height))
     
     # Add text to button - using the same pixel font as draw_text
-    try:
-        font = pygame.font.Font('assets/pixel_font.otf', size)
-    except pygame.error:
-        # Fallback to default font if custom font not found
-        font = pygame.font.Font(None, size)
+    font = get_font(size)
     
-    text_surf = font.render(text, True, (255, 255, 255))
+    text_surf = render_text(font, text, (255, 255, 255))
     text_rect = text_surf.get_rect()
     text_rect.center = (x + width//2, y + height//2)
     screen.blit(text_surf, text_rect)
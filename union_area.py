@@ -0,0 +1,79 @@
+class CoverTree:
+    """Segment tree over compressed y coordinates that tracks covered length.
+
+    Each node counts how many active rectangles span its whole interval and
+    caches the covered length below it, so adding or removing a span and
+    reading the total covered length are O(log n).
+    """
+
+    def __init__(self, ys):
+        self.ys = ys
+        size = 4 * max(len(ys), 1)
+        self.count = [0] * size
+        self.covered = [0] * size
+
+    def total(self):
+        return self.covered[1]
+
+    def update(self, lo, hi, delta, node=1, left=0, right=None):
+        """Add ``delta`` to the cover count of the span ys[lo]..ys[hi]."""
+        if right is None:
+            right = len(self.ys) - 1
+        if hi <= left or right <= lo:
+            return
+        if lo <= left and right <= hi:
+            self.count[node] += delta
+        else:
+            mid = (left + right) // 2
+            self.update(lo, hi, delta, 2 * node, left, mid)
+            self.update(lo, hi, delta, 2 * node + 1, mid, right)
+        if self.count[node] > 0:
+            self.covered[node] = self.ys[right] - self.ys[left]
+        elif right - left == 1:
+            self.covered[node] = 0
+        else:
+            self.covered[node] = self.covered[2 * node] + self.covered[2 * node + 1]
+
+
+def clip_rect(rect, bounds):
+    """Intersection of two ``(x, y, width, height)`` rects, or None if they don't overlap."""
+    x1 = max(rect[0], bounds[0])
+    y1 = max(rect[1], bounds[1])
+    x2 = min(rect[0] + rect[2], bounds[0] + bounds[2])
+    y2 = min(rect[1] + rect[3], bounds[1] + bounds[3])
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return x1, y1, x2 - x1, y2 - y1
+
+
+def union_area(rects, bounds=None):
+    """Exact area covered by a set of possibly overlapping rects.
+
+    Rects are ``(x, y, width, height)`` (pygame Rects work too). With
+    ``bounds`` only the part inside that rect is counted. Sweeps a vertical
+    line across the rect edges in x order while a CoverTree keeps the
+    covered y length, so it runs in O(n log n).
+    """
+    if bounds is not None:
+        rects = [clip_rect(rect, bounds) for rect in rects]
+    rects = [rect for rect in rects if rect is not None and rect[2] > 0 and rect[3] > 0]
+    if not rects:
+        return 0
+
+    ys = sorted({y for rect in rects for y in (rect[1], rect[1] + rect[3])})
+    y_index = {y: i for i, y in enumerate(ys)}
+    edges = []
+    for x, y, width, height in rects:
+        lo, hi = y_index[y], y_index[y + height]
+        edges.append((x, 1, lo, hi))
+        edges.append((x + width, -1, lo, hi))
+    edges.sort()
+
+    tree = CoverTree(ys)
+    area = 0
+    last_x = edges[0][0]
+    for x, delta, lo, hi in edges:
+        area += tree.total() * (x - last_x)
+        tree.update(lo, hi, delta)
+        last_x = x
+    return area